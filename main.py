@@ -1,9 +1,18 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from routes import varenv, auth, dbm 
-from src import TokenManager
+from src import TokenManager, EngineRegistry, ModelRegistry
 
-app = FastAPI(title="SgexTools API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Índice de modelos para las rutas /dbm (sin recorrer modelos/ por petición)
+    ModelRegistry.load()
+    yield
+    # Libera los pools de conexiones compartidos por los gestores de BD
+    await EngineRegistry.dispose_all_async()
+
+app = FastAPI(title="SgexTools API", lifespan=lifespan)
 
 # Lista de orígenes permitidos (puede ser frontend en React/Vue/etc.)
 origins = [
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Numeric, Index
+from src import Base
+
+class CatalogoCFDI(Base):
+    __tablename__ = "catalogo_cfdi"
+
+    uuid = Column(String(36), primary_key=True)
+    path = Column(String(500), nullable=False, index=True)
+    directorio = Column(String(500), nullable=False, index=True)  # Carpeta del RFC emisor
+    rfc = Column(String(13), nullable=False)  # RFC dueño del archivo (files/<RFC>)
+    anio = Column(Integer, nullable=False)
+    mes = Column(Integer, nullable=False)
+    tipo = Column(String(1), nullable=False)  # E | I | P
+    emisor_rfc = Column(String(13), nullable=False)
+    fecha = Column(DateTime)
+    total = Column(Numeric(18, 6))
+    moneda = Column(String(3))
+    size = Column(BigInteger)
+    mtime = Column(BigInteger)  # Nanosegundos (st_mtime_ns)
+    hash = Column(String(64))  # SHA256 del contenido
+
+    __table_args__ = (
+        Index("ix_catalogo_cfdi_periodo", "rfc", "anio", "mes", "tipo"),
+        Index("ix_catalogo_cfdi_emisor", "emisor_rfc", "anio", "mes", "tipo"),
+    )
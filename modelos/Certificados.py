@@ -13,4 +13,4 @@ class CertificadoSAT(Base):
     valido_hasta = Column(DateTime)
     # cer = Column(LargeBinary, nullable=True)  # Acepta NULL
     # key = Column(LargeBinary, nullable=True)  # Acepta NULL
-    pwd = Column(String(255))
\ No newline at end of file
+    pwd = Column(String(255), info={"sensitive": True})  # No se exporta salvo que se pida
\ No newline at end of file
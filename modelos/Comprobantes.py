@@ -0,0 +1,34 @@
+from sqlalchemy import Column, String, DateTime, Numeric, Index
+from src import Base
+
+class ComprobanteCFDI(Base):
+    __tablename__ = "cfdi_comprobantes"
+
+    uuid = Column(String(36), primary_key=True)
+    rfc = Column(String(13))  # RFC dueño del archivo (files/<RFC>)
+    version = Column(String(5))
+    serie = Column(String(25))
+    folio = Column(String(40))
+    fecha = Column(DateTime)
+    fecha_timbrado = Column(DateTime)
+    tipo = Column(String(1))
+    subtotal = Column(Numeric(18, 6))
+    descuento = Column(Numeric(18, 6))
+    total = Column(Numeric(18, 6))
+    moneda = Column(String(3))
+    tipo_cambio = Column(Numeric(18, 6))
+    metodo_pago = Column(String(3))
+    forma_pago = Column(String(2))
+    no_certificado = Column(String(20))
+    emisor_rfc = Column(String(13))
+    emisor_nombre = Column(String(300))
+    receptor_rfc = Column(String(13))
+    receptor_nombre = Column(String(300))
+    iva_trasladado = Column(Numeric(18, 6))
+    iva_retenido = Column(Numeric(18, 6))
+    path = Column(String(500))
+
+    __table_args__ = (
+        Index("ix_cfdi_comprobantes_emisor", "emisor_rfc", "fecha"),
+        Index("ix_cfdi_comprobantes_periodo", "rfc", "fecha", "tipo"),
+    )
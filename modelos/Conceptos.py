@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, Integer, Numeric, ForeignKey
+from src import Base
+
+class ConceptoCFDI(Base):
+    __tablename__ = "cfdi_conceptos"
+
+    uuid = Column(String(36), ForeignKey("cfdi_comprobantes.uuid"), primary_key=True)
+    numero = Column(Integer, primary_key=True)  # Orden del concepto dentro del comprobante
+    clave_prod_serv = Column(String(8))
+    no_identificacion = Column(String(100))
+    cantidad = Column(Numeric(18, 6))
+    clave_unidad = Column(String(3))
+    unidad = Column(String(20))
+    descripcion = Column(String(1000))
+    valor_unitario = Column(Numeric(18, 6))
+    importe = Column(Numeric(18, 6))
+    descuento = Column(Numeric(18, 6))
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, String, Integer, BigInteger
+from src import Base
+
+class DirectorioCFDI(Base):
+    __tablename__ = "catalogo_directorios"
+
+    path = Column(String(500), primary_key=True)
+    padre = Column(String(500), index=True)
+    nivel = Column(Integer, nullable=False)  # 0=RECIBIDOS, 1=año, 2=mes, 3=tipo, 4=RFC emisor
+    mtime = Column(BigInteger, nullable=False)
@@ -1,7 +1,15 @@
+from .Catalogo import CatalogoCFDI
 from .Certificados import CertificadoSAT
+from .Comprobantes import ComprobanteCFDI
+from .Conceptos import ConceptoCFDI
+from .Directorios import DirectorioCFDI
 from .Solicitudes import SolicitudSAT
 
 __all__ = [
+    "CatalogoCFDI",
     "CertificadoSAT",
+    "ComprobanteCFDI",
+    "ConceptoCFDI",
+    "DirectorioCFDI",
     "SolicitudSAT"
 ]
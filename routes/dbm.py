@@ -1,12 +1,20 @@
 from fastapi import APIRouter, HTTPException, Request
-from src import LoggerFactory, DBFactory
-import os, importlib, importlib.util,inspect
-from pathlib import Path
+from fastapi.responses import Response, StreamingResponse
+from src import LoggerFactory, DBFactory, DBStats, ReadRouter, CircuitBreaker, DataBaseUnavailable
+from src import Exporter, EXPORT_FORMATS, ModelRegistry
+import json, codecs
+from datetime import date, datetime
+from sqlalchemy import Date, DateTime
 
 
 router = APIRouter()
 logger = LoggerFactory().get_logger("db", "db.log", consola=True)
 
+def _no_disponible(e: DataBaseUnavailable):
+    # Falla rápida mientras el destino está caído: el cliente puede reintentar después
+    logger.warning(f"Base de datos no disponible: {e}")
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after or 30)})
+
 @router.post("/db")
 async def crear_db(request: Request):
     content_type = request.headers.get("content-type", "").lower()
@@ -27,12 +35,14 @@ async def crear_db(request: Request):
         if not tipo or not nombre:
             raise HTTPException(status_code=422, detail="Faltan campos requeridos: 'tipo' y 'nombre'")
 
-        with DBFactory.get(tipo, nombre) as db:
+        async with DBFactory.get_async(tipo, nombre) as db:
             logger.info(f"Base '{nombre}' verificada o creada correctamente.")
             return {"status": "ok", "message": f"Base '{nombre}' lista."}
 
     except HTTPException:
         raise
+    except DataBaseUnavailable as e:
+        raise _no_disponible(e)
     except Exception as e:
         logger.error(f"Error al conectar/crear base '{nombre}': {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -53,43 +63,24 @@ async def crear_tabla(request: Request):
         if not base or not tabla:
             raise HTTPException(status_code=422, detail="Faltan campos requeridos: 'base' y 'tabla'")
 
-        modelos_path = Path(__file__).resolve().parents[1] / "modelos"
-        modelo = None
-
-        for archivo in modelos_path.glob("*.py"):
-            if archivo.name.startswith("_"):
-                continue
-
-            modulo_name = f"modelos.{archivo.stem}"
-            try:
-                spec = importlib.util.find_spec(modulo_name)
-                if not spec:
-                    continue
-                mod = importlib.import_module(modulo_name)
-                for nombre, clase in inspect.getmembers(mod, inspect.isclass):
-                    if nombre == tabla and hasattr(clase, "__tablename__"):
-                        modelo = clase
-                        break
-                if modelo:
-                    break
-            except Exception as e:
-                logger.warning(f"No se pudo cargar modelo desde {modulo_name}: {e}")
-
+        modelo = ModelRegistry.get(tabla)
         if not modelo:
             raise HTTPException(status_code=404, detail=f"Modelo '{tabla}' no encontrado en 'modelos/'.")
 
-        with DBFactory.get(tipo, base) as db:
-            db.create_table(modelo)
+        async with DBFactory.get_async(tipo, base) as db:
+            await db.create_table(modelo)
             logger.info(f"Tabla '{tabla}' verificada en base '{base}'.")
 
             inserted_pk = None
             if registro:
                 try:
                     instancia = modelo(**registro)
-                    db.add_record(instancia)
+                    await db.add_record(instancia)
                     logger.info(f"Registro insertado en tabla '{tabla}'.")
                     # Obtener el valor del campo PK
                     inserted_pk = getattr(instancia, "rfc_empresa", None)
+                except DataBaseUnavailable as e:
+                    raise _no_disponible(e)
                 except Exception as e:
                     logger.error(f"Error al insertar registro en '{tabla}'")
                     raise HTTPException(status_code=400, detail=f"Registro inválido para el modelo '{tabla}'.")
@@ -102,34 +93,326 @@ async def crear_tabla(request: Request):
 
     except HTTPException:
         raise
+    except DataBaseUnavailable as e:
+        raise _no_disponible(e)
     except Exception as e:
         logger.error(f"Error en creación de tabla o inserción de registro: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/tabla")
-def listar_modelos():
-    try:
-        modelos_path = Path(__file__).resolve().parents[1] / "modelos"
-        modelos_disponibles = []
+MAX_ERRORES_LOTE = 1000  # Errores por fila que se detallan en la respuesta
+
+async def _filas_ndjson(request: Request):
+    """Genera (fila, error) por cada línea del cuerpo NDJSON conforme va llegando."""
+    pendiente = b""
+    async for bloque in request.stream():
+        pendiente += bloque
+        *lineas, pendiente = pendiente.split(b"\n")
+        for linea in lineas:
+            if linea.strip():
+                try:
+                    yield json.loads(linea), None
+                except json.JSONDecodeError as e:
+                    yield None, f"JSON inválido: {e}"
+    if pendiente.strip():
+        try:
+            yield json.loads(pendiente), None
+        except json.JSONDecodeError as e:
+            yield None, f"JSON inválido: {e}"
+
+MAX_ELEMENTO = 1 << 20  # Caracteres que puede ocupar un elemento del arreglo JSON
+
+def _fin_elemento(texto, pos):
+    """Índice de la ',' o ']' que cierra el elemento que empieza en `pos` (fuera de cadenas), o None."""
+    profundidad, cadena, escape = 0, False, False
+    for i in range(pos, len(texto)):
+        c = texto[i]
+        if cadena:
+            if escape:
+                escape = False
+            elif c == "\\":
+                escape = True
+            elif c == '"':
+                cadena = False
+        elif c == '"':
+            cadena = True
+        elif c in "[{":
+            profundidad += 1
+        elif c in "]}" and profundidad:
+            profundidad -= 1
+        elif c in ",]" and not profundidad:
+            return i
+    return None
+
+class _ArregloJSON:
+    """
+    Parser incremental de un arreglo JSON. `alimentar` recibe el texto conforme
+    llega y regresa (fila, error) por cada elemento completo. Un elemento
+    inválido (o sin ',' antes) se reporta como fila fallida y la lectura sigue
+    en el siguiente; un elemento incompleto espera al siguiente bloque. Sólo se
+    retiene el elemento en curso, hasta MAX_ELEMENTO caracteres.
+    """
 
-        for archivo in modelos_path.glob("*.py"):
-            if archivo.name.startswith("_"):
-                continue  # ignorar __init__.py u otros privados
+    def __init__(self):
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.estado = "inicio"  # inicio | elemento | separador | fin | descartado
+        self.elementos = 0
+
+    def alimentar(self, texto, final=False):
+        if self.estado in ("fin", "descartado"):
+            return []
+        buffer, pos, filas = self.buffer + texto, 0, []
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if self.estado == "inicio":
+                if buffer[pos] != "[":
+                    raise HTTPException(status_code=400, detail="El cuerpo debe ser un arreglo JSON.")
+                self.estado, pos = "elemento", pos + 1
+            elif self.estado == "separador":
+                if buffer[pos] in ",]":
+                    self.estado = "elemento" if buffer[pos] == "," else "fin"
+                    pos += 1
+                    if self.estado == "fin":
+                        break
+                    continue
+                fin = _fin_elemento(buffer, pos)
+                if fin is None:
+                    break
+                filas.append((None, "Falta ',' entre elementos del arreglo."))
+                self.elementos += 1
+                pos = fin
+            elif buffer[pos] == "]" and not self.elementos:
+                self.estado, pos = "fin", pos + 1  # Arreglo vacío
+                break
+            else:
+                try:
+                    fila, fin = self.decoder.raw_decode(buffer, pos)
+                    siguiente = fin
+                    while siguiente < len(buffer) and buffer[siguiente].isspace():
+                        siguiente += 1
+                    if siguiente >= len(buffer) and not final:
+                        break  # Un número al final del bloque puede continuar en el siguiente
+                    filas.append((fila, None))
+                except json.JSONDecodeError as e:
+                    fin = _fin_elemento(buffer, pos)
+                    if fin is None:
+                        break  # Elemento incompleto: se espera el siguiente bloque (o `cerrar` lo reporta)
+                    filas.append((None, f"JSON inválido: {e.msg}"))
+                self.elementos += 1
+                self.estado, pos = "separador", fin
+        self.buffer = buffer[pos:]
+        if len(self.buffer) > MAX_ELEMENTO:
+            # Sin cierre a la vista no hay dónde retomar: el resto del cuerpo se descarta sin acumularlo
+            filas.append((None, f"Elemento de más de {MAX_ELEMENTO} caracteres; se descartó el resto del cuerpo."))
+            self.estado, self.buffer = "descartado", ""
+        return filas
+
+    def cerrar(self):
+        filas = self.alimentar("", final=True)
+        if self.estado not in ("fin", "descartado"):
+            filas.append((None, "Arreglo JSON incompleto: el cuerpo terminó antes de ']'."))
+        return filas
+
+async def _filas_arreglo(request: Request):
+    """Genera (fila, error) por cada elemento de un arreglo JSON sin leer el cuerpo completo."""
+    parser = _ArregloJSON()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    async for bloque in request.stream():
+        for fila in parser.alimentar(utf8.decode(bloque)):
+            yield fila
+    for fila in parser.alimentar(utf8.decode(b"", final=True)) + parser.cerrar():
+        yield fila
+
+def _validar_fila(modelo, fila):
+    """Regresa (fila lista para INSERT, None) o (None, motivo del rechazo)."""
+    if not isinstance(fila, dict):
+        return None, "La fila no es un objeto JSON."
+    tabla = modelo.__table__
+    desconocidas = [k for k in fila if k not in tabla.columns]
+    if desconocidas:
+        return None, f"Columnas desconocidas: {', '.join(desconocidas)}"
+    valores = {}
+    for columna in tabla.columns:
+        if columna.name not in fila:
+            requerida = (not columna.nullable and columna.default is None and columna.server_default is None
+                         and columna is not tabla.autoincrement_column)
+            if requerida:
+                return None, f"Falta la columna requerida '{columna.name}'."
+            continue
+        valor = fila[columna.name]
+        if valor is None:
+            if not columna.nullable:
+                return None, f"La columna '{columna.name}' no admite nulos."
+        elif isinstance(columna.type, (DateTime, Date)) and isinstance(valor, str):
+            try:
+                valor = datetime.fromisoformat(valor) if isinstance(columna.type, DateTime) else date.fromisoformat(valor)
+            except ValueError:
+                return None, f"Fecha inválida en '{columna.name}': {valor}"
+        elif isinstance(valor, str) and getattr(columna.type, "length", None) and len(valor) > columna.type.length:
+            return None, f"'{columna.name}' excede {columna.type.length} caracteres."
+        valores[columna.name] = valor
+    return valores, None
 
-            nombre_modulo = f"modelos.{archivo.stem}"
+async def _insertar_lote(db, modelo, lote, resumen):
+    """
+    Inserta un lote de (número, fila); si falla, reintenta fila por fila para
+    ubicar los errores. Éstos van sólo al resumen: un log por fila inundaría
+    db.log con miles de líneas.
+    """
+    # executemany requiere las mismas columnas en cada fila: se agrupa por llaves
+    grupos = {}
+    for numero, fila in lote:
+        grupos.setdefault(tuple(sorted(fila)), []).append((numero, fila))
+    for filas in grupos.values():
+        try:
+            resumen["insertados"] += await db.add_records(
+                modelo, [f for _, f in filas], chunk_size=len(filas), log_errors=False
+            )
+            continue
+        except DataBaseUnavailable:
+            raise
+        except Exception:
+            pass
+        for numero, fila in filas:
             try:
-                modulo = importlib.import_module(nombre_modulo)
-                for nombre, clase in inspect.getmembers(modulo, inspect.isclass):
-                    if hasattr(clase, "__tablename__"):
-                        modelos_disponibles.append(nombre)
+                resumen["insertados"] += await db.add_records(modelo, [fila], log_errors=False)
+            except DataBaseUnavailable:
+                raise
             except Exception as e:
-                logger.warning(f"No se pudo cargar {nombre_modulo}: {e}")
+                _error_fila(resumen, numero, str(getattr(e, "orig", e)))
 
-        return {
-            "status": "ok",
-            "modelos_disponibles": sorted(modelos_disponibles)
-        }
+def _error_fila(resumen, numero, motivo):
+    resumen["fallidos"] += 1
+    if len(resumen["errores"]) < MAX_ERRORES_LOTE:
+        resumen["errores"].append({"fila": numero, "error": motivo})
 
+@router.post("/tabla/lote")
+async def insertar_lote(request: Request, base: str, tabla: str, tipo: str = "mssql", lote: int = 1000):
+    """
+    Inserción masiva desde un cuerpo NDJSON (application/x-ndjson) o un arreglo
+    JSON (application/json), leído en streaming. Las filas se validan contra
+    el modelo y se insertan en transacciones de `lote` filas; las filas
+    rechazadas se reportan (número de fila 1-based) sin detener la carga.
+    """
+    content_type = request.headers.get("content-type", "").lower()
+    if "ndjson" in content_type or "jsonl" in content_type:
+        filas = _filas_ndjson(request)
+    elif "application/json" in content_type:
+        filas = _filas_arreglo(request)
+    else:
+        raise HTTPException(status_code=415, detail="Use application/x-ndjson o application/json (arreglo).")
+
+    modelo = ModelRegistry.get(tabla)
+    if not modelo:
+        raise HTTPException(status_code=404, detail=f"Modelo '{tabla}' no encontrado en 'modelos/'.")
+    lote = max(1, min(lote, 10000))
+
+    resumen = {"recibidos": 0, "insertados": 0, "fallidos": 0, "errores": []}
+    try:
+        async with DBFactory.get_async(tipo, base) as db:
+            await db.create_table(modelo)
+            pendientes = []
+            async for fila, error in filas:
+                resumen["recibidos"] += 1
+                if error is None:
+                    fila, error = _validar_fila(modelo, fila)
+                if error is not None:
+                    _error_fila(resumen, resumen["recibidos"], error)
+                    continue
+                pendientes.append((resumen["recibidos"], fila))
+                if len(pendientes) >= lote:
+                    await _insertar_lote(db, modelo, pendientes, resumen)
+                    pendientes = []
+            if pendientes:
+                await _insertar_lote(db, modelo, pendientes, resumen)
+    except HTTPException:
+        raise
+    except DataBaseUnavailable as e:
+        raise _no_disponible(e)
     except Exception as e:
-        logger.error(f"Error al listar modelos: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        logger.error(f"Error en inserción por lote en '{tabla}': {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    logger.info(
+        f"Lote en '{tabla}': {resumen['insertados']} insertados, {resumen['fallidos']} fallidos "
+        f"de {resumen['recibidos']} recibidos."
+    )
+    return {"status": "ok", "tabla": tabla, **resumen}
+
+@router.get("/exportar")
+def exportar_tabla(base: str, tabla: str, tipo: str = "mssql", formato: str = "csv",
+                   columnas: str = None, filtros: str = None):
+    """
+    Descarga una tabla de `modelos/` como CSV, NDJSON o XLSX sin cargarla en
+    memoria. `columnas` es una lista separada por comas y `filtros` un objeto
+    JSON columna -> valor (o lista de valores). Sin `columnas` se omiten las
+    columnas sensibles del modelo (p. ej. contraseñas).
+    """
+    if formato not in EXPORT_FORMATS:
+        raise HTTPException(status_code=422, detail=f"Formato no soportado: {formato}. Use csv, ndjson o xlsx.")
+    modelo = ModelRegistry.get(tabla)
+    if not modelo:
+        raise HTTPException(status_code=404, detail=f"Modelo '{tabla}' no encontrado en 'modelos/'.")
+
+    columnas = [c.strip() for c in columnas.split(",") if c.strip()] if columnas else None
+    try:
+        filtros = json.loads(filtros) if filtros else None
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=422, detail="'filtros' debe ser un objeto JSON.")
+    desconocidas = [c for c in (columnas or []) + list(filtros or {}) if c not in modelo.__table__.columns]
+    if desconocidas:
+        raise HTTPException(status_code=422, detail=f"Columnas desconocidas en '{tabla}': {', '.join(desconocidas)}")
+
+    # La consulta se inicia aquí: sus errores se responden antes del 200
+    db = None
+    try:
+        db = DBFactory.get(tipo, base)
+        db.connect()
+        bloques = Exporter(db).table(modelo, formato, columns=columnas, filters=filtros)
+    except DataBaseUnavailable as e:
+        if db is not None:
+            db.close()
+        raise _no_disponible(e)
+    except Exception as e:
+        if db is not None:
+            db.close()
+        logger.error(f"Error al exportar '{tabla}' de base '{base}': {getattr(e, 'orig', e)}")
+        raise HTTPException(status_code=500, detail=f"No se pudo exportar '{tabla}': {getattr(e, 'orig', e)}")
+
+    def contenido():
+        try:
+            yield from bloques
+            logger.info(f"Tabla '{tabla}' exportada como {formato}.")
+        finally:
+            db.close()
+
+    media_type, extension = EXPORT_FORMATS[formato]
+    return StreamingResponse(
+        contenido(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{tabla}.{extension}"'},
+    )
+
+@router.get("/tabla")
+def listar_modelos():
+    # Lista serializada una sola vez (ver ModelRegistry)
+    return Response(content=ModelRegistry.listing(), media_type="application/json")
+
+@router.post("/modelos/recargar")
+def recargar_modelos():
+    """Importa los modelos agregados a `modelos/` desde el arranque."""
+    try:
+        modelos = ModelRegistry.reload()
+        return {"status": "ok", "modelos_disponibles": modelos}
+    except Exception as e:
+        logger.error(f"Error al recargar modelos: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/stats")
+def estadisticas():
+    """Latencias (histogramas), filas, errores y ocupación de pool por destino de base de datos."""
+    return {"status": "ok", "estadisticas": DBStats.snapshot(), "replicas_fuera": ReadRouter.status(),
+            "circuitos": CircuitBreaker.status()}
@@ -0,0 +1,194 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), ".")))
+
+import asyncio
+from functools import partial
+from sqlalchemy import insert, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from src import LoggerFactory, EngineRegistry, DBStats
+from .BaseDBM import Base, DataBaseFail
+
+logger = LoggerFactory().get_logger("db", "db.log", consola=True)
+
+# Driver asyncio equivalente a cada dialecto síncrono
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+class AsyncBaseDBManager:
+    """
+    Contraparte asyncio de BaseDBManager sobre sqlalchemy.ext.asyncio.
+    Recibe una función que construye el gestor síncrono; ésta se ejecuta en un
+    hilo dentro de `connect`, de modo que la verificación/creación de la base
+    tampoco bloquea el event loop. La configuración (URI, pool, tablas ya
+    verificadas) se toma del gestor síncrono.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self.manager = None
+        self.engine = None
+        self.Session = None
+
+    async def _manager(self):
+        if self.manager is None:
+            self.manager = await asyncio.to_thread(self._factory)
+        if not self.manager._database_ready:
+            raise self.manager._not_ready_error()
+        return self.manager
+
+    async def connect(self):
+        manager = await self._manager()
+        url = make_url(manager.database_uri)
+        backend = url.get_backend_name()
+        if backend not in ASYNC_DRIVERS:
+            raise DataBaseFail(f"Dialecto sin driver asyncio: {backend}")
+        uri = url.set(drivername=ASYNC_DRIVERS[backend])
+        key = ("async",) + manager._pool_key()
+        factory = partial(self._create_engine, manager)
+        self.engine = EngineRegistry.get(key, uri, factory=factory, **manager._engine_options())
+        self.Session = async_sessionmaker(bind=self.engine, expire_on_commit=False)
+
+    @staticmethod
+    def _create_engine(manager, uri, **options):
+        # Los eventos de conexión del gestor síncrono se registran en el engine
+        # subyacente, sin la prueba TCP bloqueante: el event loop sólo consulta
+        # el interruptor (la prueba ya corrió en un hilo al construir el gestor)
+        options.setdefault("hide_parameters", manager.hide_parameters)
+        engine = create_async_engine(uri, **options)
+        manager._configure_engine(engine.sync_engine, probe=False)
+        return engine
+
+    async def create_table(self, model_class):
+        if not self.engine:
+            await self.connect()
+        known = self.manager._known_tables()
+        if model_class.__tablename__ in known:
+            return
+        async with self.engine.begin() as conn:
+            await conn.run_sync(model_class.__table__.create, checkfirst=True)
+        known.add(model_class.__tablename__)
+        logger.info(f"Tabla '{model_class.__tablename__}' creada o ya existente.")
+
+    async def create_tables(self, *model_classes):
+        if not self.engine:
+            await self.connect()
+        tables = [m.__table__ for m in model_classes] or list(Base.metadata.sorted_tables)
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=tables)
+        self.manager._known_tables().update(t.name for t in tables)
+        logger.info("Tablas creadas o ya existentes.")
+
+    async def add_record(self, record):
+        if not self.engine:
+            await self.connect()
+        async with self.Session() as session:
+            try:
+                session.add(record)
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                logger.error(f"Error al agregar registro: {e}")
+                raise
+            finally:
+                self.manager._after_write(type(record))
+
+    async def add_records(self, table_class, records, chunk_size=5000, log_errors=True):
+        """Inserta una lista de diccionarios en lotes de `chunk_size`, cada lote en una transacción."""
+        if not self.engine:
+            await self.connect()
+        stmt = insert(table_class)
+        total = 0
+        try:
+            for i in range(0, len(records), chunk_size):
+                lote = records[i:i + chunk_size]
+                async with self.engine.begin() as conn:
+                    await conn.execute(stmt, lote)
+                total += len(lote)
+        except Exception as e:
+            if log_errors:
+                logger.error(f"Error al agregar registros en '{table_class.__tablename__}': {getattr(e, 'orig', e)}")
+            raise
+        finally:
+            self.manager._after_write(table_class)
+        return total
+
+    async def get_records(self, table_class):
+        if not self.engine:
+            await self.connect()
+        async with self.Session() as session:
+            result = await session.execute(select(table_class))
+            records = result.scalars().all()
+        if self.manager.stats:
+            DBStats.add_rows(self.engine, len(records))
+        return records
+
+    async def close(self):
+        # El engine es compartido (EngineRegistry): sólo se suelta la referencia
+        self.engine = None
+        self.Session = None
+        if self.manager is not None:
+            self.manager.close()
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+
+class AsyncExecutorDBManager(AsyncBaseDBManager):
+    """
+    Variante para dialectos sin driver asyncio (MSSQL/pyodbc): cada operación
+    del gestor síncrono se ejecuta en un pool de hilos, fuera del event loop.
+    """
+
+    def __init__(self, factory, executor=None):
+        super().__init__(factory)
+        self.executor = executor
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(func, *args, **kwargs))
+
+    async def connect(self):
+        manager = await self._manager()
+        await self._run(manager.connect)
+        self.engine = manager.engine
+        self.Session = manager.Session
+
+    async def create_table(self, model_class):
+        if not self.engine:
+            await self.connect()
+        await self._run(self.manager.create_table, model_class)
+
+    async def create_tables(self, *model_classes):
+        if not self.engine:
+            await self.connect()
+        await self._run(self.manager.create_tables, *model_classes)
+
+    async def add_record(self, record):
+        if not self.engine:
+            await self.connect()
+        await self._run(self.manager.add_record, record)
+
+    async def add_records(self, table_class, records, chunk_size=5000, log_errors=True):
+        if not self.engine:
+            await self.connect()
+        return await self._run(self.manager.add_records, table_class, records, chunk_size, log_errors)
+
+    async def get_records(self, table_class):
+        if not self.engine:
+            await self.connect()
+        return await self._run(self.manager.get_records, table_class)
+
+    async def close(self):
+        self.engine = None
+        self.Session = None
+        if self.manager is not None:
+            await self._run(self.manager.close)
@@ -1,52 +1,371 @@
 import sys, os
+import time
+import threading
+from contextlib import contextmanager
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), ".")))
 
-from sqlalchemy import create_engine
+from functools import partial
+from sqlalchemy import and_, create_engine, delete, event, insert, inspect, or_, select, update
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy.pool import NullPool
-from src import LoggerFactory
+from src import LoggerFactory, EngineRegistry, QueryCache, DBStats, ReadRouter, CircuitBreaker, is_port_open
 
 Base = declarative_base()
 logger = LoggerFactory().get_logger("db", "db.log", consola=True)
 
+# Puertos por omisión de los dialectos de red (para la prueba TCP)
+DEFAULT_PORTS = {"mssql": 1433, "mysql": 3306, "postgresql": 5432}
+
+# Parámetros por sentencia que acepta SQL Server (el más restrictivo de los dialectos)
+MAX_PARAMS = 2100
+
 class DataBaseFail(Exception):
     pass
 
+class DataBaseUnavailable(DataBaseFail):
+    """El destino no responde (circuito abierto o puerto cerrado): la API responde 503."""
+
+    def __init__(self, message, retry_after=0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def _env_bool(valor):
+    return str(valor).strip().lower() in ("1", "true", "yes", "si", "sí")
+
+def _guard_connect(breaker, endpoint, timeout, dialect, conn_rec, cargs, cparams):
+    # do_connect: antes del handshake del driver (p. ej. ODBC con timeout de 30 s).
+    # Con timeout None (engines asyncio) sólo se consulta el interruptor: la
+    # prueba TCP es bloqueante y detendría el event loop.
+    if not breaker.allow():
+        raise DataBaseUnavailable(f"Destino {endpoint[0]}:{endpoint[1]} no disponible.", breaker.retry_after())
+    if timeout is not None and not is_port_open(*endpoint, timeout=timeout):
+        breaker.failure()
+        raise DataBaseUnavailable(f"Destino {endpoint[0]}:{endpoint[1]} no disponible.", breaker.retry_after())
+
+def _connected(breaker, dbapi_connection, connection_record):
+    breaker.success()
+
+def _connect_failed(breaker, exception_context):
+    # El pre-ping descarta conexiones viejas del pool; no es un fallo del destino
+    if exception_context.is_pre_ping:
+        return
+    if exception_context.connection is None and not isinstance(exception_context.original_exception, DataBaseUnavailable):
+        breaker.failure()
+
+def _freeze(value):
+    # Filtros/proyecciones en una forma hashable para la llave de la caché
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
 class BaseDBManager:
-    def __init__(self, database_uri):
+    # Destinos (dialecto, servidor, base) ya verificados/creados en este proceso
+    _verified_databases = set()
+    # Tablas ya verificadas por destino de engine (ver `_pool_key`)
+    _verified_tables = {}
+    _verified_lock = threading.Lock()
+
+    def __init__(self, database_uri, **kwargs):
         self.database_uri = database_uri
         self.engine = None
         self.Session = None
-        self._database_ready = self._check_or_create_database()
+        # pooled=False conserva el comportamiento anterior: un engine NullPool por gestor
+        self.pooled = _env_bool(kwargs.get("pooled", os.getenv("dbPool", "true")))
+        self.pool_options = {
+            "pool_size": int(kwargs.get("pool_size", os.getenv("dbPoolSize", 5))),
+            "max_overflow": int(kwargs.get("max_overflow", os.getenv("dbPoolOverflow", 10))),
+            "pool_recycle": int(kwargs.get("pool_recycle", os.getenv("dbPoolRecycle", 1800))),
+            "pool_timeout": int(kwargs.get("pool_timeout", os.getenv("dbPoolTimeout", 30))),
+            "pool_pre_ping": _env_bool(kwargs.get("pool_pre_ping", os.getenv("dbPoolPrePing", "true"))),
+        }
+        # Métricas de pool/consultas (ver DBStats) y umbral del log de consultas lentas
+        self.stats = _env_bool(kwargs.get("stats", os.getenv("dbStats", "true")))
+        self.slow_query_ms = float(kwargs.get("slow_query_ms", os.getenv("dbSlowQueryMs", 500)))
+        # Los parámetros de las sentencias (p. ej. contraseñas) no aparecen en errores ni logs
+        self.hide_parameters = _env_bool(kwargs.get("hide_parameters", os.getenv("dbHideParameters", "true")))
+        # Interruptor por destino y prueba TCP previa al handshake (sólo destinos de red)
+        self.probe_timeout = float(kwargs.get("probe_timeout", os.getenv("dbProbeTimeout", 1)))
+        self.breaker = None
+        self._unavailable = False
+        if self._endpoint() and _env_bool(kwargs.get("breaker", os.getenv("dbBreaker", "true"))):
+            self.breaker = CircuitBreaker.for_key(
+                self._database_key(),
+                failure_threshold=int(kwargs.get("breaker_failures", os.getenv("dbBreakerFailures", 3))),
+                reset_timeout=float(kwargs.get("breaker_reset", os.getenv("dbBreakerReset", 30))),
+            )
+        self._database_ready = self._ensure_database()
+        # Caché de lecturas (opt-in), compartida por los gestores del mismo destino
+        # aunque usen engines distintos (p. ej. lector y escritor SQLite)
+        self.cache = None
+        if _env_bool(kwargs.get("cache", os.getenv("dbCache", "false"))):
+            self.cache = QueryCache.for_key(
+                self._database_key(),
+                max_entries=int(kwargs.get("cache_entries", os.getenv("dbCacheEntries", 1024))),
+                ttl=float(kwargs.get("cache_ttl", os.getenv("dbCacheTTL", 300))),
+            )
+        # Réplicas de lectura: las escrituras y las lecturas posteriores a una
+        # escritura propia (durante `read_your_writes` segundos) van al primario
+        self.replica_uris = [self._replica_uri(r) for r in kwargs.get("replicas") or []]
+        self.replica_eject_seconds = float(kwargs.get("replica_eject_seconds", os.getenv("dbReplicaEject", 30)))
+        self.read_your_writes = float(kwargs.get("read_your_writes", os.getenv("dbReadYourWrites", 5)))
+        self.router = None
+        self._last_write = None
+        self._pinned = 0
 
     def _check_or_create_database(self):
         return True
 
+    def _database_key(self):
+        return self._pool_key()[:3]
+
+    def _url_endpoint(self, uri):
+        """(host, puerto) del servidor de `uri`, o None para bases locales."""
+        url = make_url(uri)
+        if not url.host:
+            return None
+        return url.host, url.port or DEFAULT_PORTS.get(url.get_backend_name())
+
+    def _endpoint(self):
+        """(host, puerto) del servidor, o None para bases locales."""
+        return self._url_endpoint(self.database_uri)
+
+    def _reachable(self):
+        endpoint = self._endpoint()
+        if is_port_open(*endpoint, timeout=self.probe_timeout):
+            return True
+        logger.warning(f"Sin respuesta TCP de {endpoint[0]}:{endpoint[1]}.")
+        return False
+
+    def _not_ready_error(self):
+        if self._unavailable or (self.breaker is not None and self.breaker.state != "closed"):
+            retry_after = self.breaker.retry_after() if self.breaker is not None else 0
+            return DataBaseUnavailable("Base de datos no disponible.", retry_after)
+        return DataBaseFail("Base de datos no conectada.")
+
+    def _ensure_database(self):
+        key = self._database_key()
+        if key in BaseDBManager._verified_databases:
+            return True
+        if self.breaker is not None:
+            # Circuito abierto o puerto cerrado: se falla sin intentar el handshake
+            if not self.breaker.allow():
+                self._unavailable = True
+                return False
+            if not self._reachable():
+                self.breaker.failure()
+                self._unavailable = True
+                return False
+        ready = self._check_or_create_database()
+        if self.breaker is not None:
+            if ready:
+                self.breaker.success()
+            else:
+                self.breaker.failure()
+        if ready:
+            with BaseDBManager._verified_lock:
+                BaseDBManager._verified_databases.add(key)
+        return ready
+
+    @classmethod
+    def invalidate_database_check(cls, key=None):
+        """Olvida la verificación de un destino (o de todos si `key` es None)."""
+        with BaseDBManager._verified_lock:
+            if key is None:
+                BaseDBManager._verified_databases.clear()
+            else:
+                BaseDBManager._verified_databases.discard(tuple(key))
+
+    def _url_key(self, uri):
+        """(dialecto, servidor:puerto, base, usuario) del destino de `uri`."""
+        url = make_url(uri)
+        host = f"{url.host}:{url.port}" if url.host and url.port else url.host
+        return (url.get_backend_name(), host, url.database, url.username)
+
+    def _pool_key(self):
+        return self._url_key(self.database_uri)
+
+    def _replica_uri(self, replica):
+        return str(replica)
+
+    def _engine_options(self):
+        return dict(self.pool_options)
+
+    def _engine_breaker(self, uri):
+        """
+        (interruptor, endpoint) del engine de `uri`: el del gestor para el
+        primario y uno propio por réplica, que prueba el puerto de la réplica.
+        Así una réplica caída no abre el circuito del primario ni al revés.
+        """
+        if self.breaker is None:
+            return None, None
+        key = self._url_key(uri)
+        if key == self._url_key(self.database_uri):
+            return self.breaker, self._endpoint()
+        endpoint = self._url_endpoint(uri)
+        if endpoint is None:
+            return None, None
+        breaker = CircuitBreaker.for_key(
+            key, failure_threshold=self.breaker.failure_threshold, reset_timeout=self.breaker.reset_timeout
+        )
+        return breaker, endpoint
+
+    def _configure_engine(self, engine, probe=True):
+        """
+        Punto de extensión para registrar eventos (p. ej. PRAGMAs) en un engine
+        nuevo. `probe=False` omite la prueba TCP bloqueante antes de conectar.
+        """
+        if self.stats:
+            # Etiqueta del destino real (servidor:puerto/base), también para odbc_connect
+            key = self._url_key(engine.url)
+            DBStats.instrument(engine, slow_ms=self.slow_query_ms, label=f"{key[0]}://{key[1] or ''}/{key[2]}")
+        breaker, endpoint = self._engine_breaker(engine.url)
+        if breaker is not None:
+            timeout = self.probe_timeout if probe else None
+            event.listen(engine, "do_connect", partial(_guard_connect, breaker, endpoint, timeout))
+            event.listen(engine, "connect", partial(_connected, breaker))
+            event.listen(engine, "handle_error", partial(_connect_failed, breaker))
+        return engine
+
+    def _create_engine(self, uri, **options):
+        options.setdefault("hide_parameters", self.hide_parameters)
+        return self._configure_engine(create_engine(uri, **options))
+
     def connect(self):
         if not self._database_ready:
-            raise DataBaseFail("Base de datos no conectada.")
-        self.engine = create_engine(self.database_uri, poolclass=NullPool)
+            raise self._not_ready_error()
+        if self.pooled:
+            self.engine = EngineRegistry.get(
+                self._pool_key(), self.database_uri, factory=self._create_engine, **self._engine_options()
+            )
+        else:
+            self.engine = self._create_engine(self.database_uri, poolclass=NullPool)
         self.Session = sessionmaker(bind=self.engine)
+        if self.replica_uris:
+            self.router = ReadRouter(
+                [(self._url_key(uri), self._replica_engine(uri)) for uri in self.replica_uris],
+                eject_seconds=self.replica_eject_seconds,
+            )
+
+    def _replica_engine(self, uri):
+        if self.pooled:
+            return EngineRegistry.get(self._url_key(uri), uri, factory=self._create_engine, **self._engine_options())
+        return self._create_engine(uri, poolclass=NullPool)
+
+    @contextmanager
+    def primary(self):
+        """Dentro del bloque todas las lecturas de este gestor van al primario."""
+        self._pinned += 1
+        try:
+            yield self
+        finally:
+            self._pinned -= 1
+
+    def _read_engines(self):
+        """Engines a intentar para una lectura: réplicas sanas en turno y al final el primario."""
+        if not self.router or self._pinned:
+            return [(None, self.engine)]
+        if self._last_write is not None and time.monotonic() - self._last_write < self.read_your_writes:
+            return [(None, self.engine)]
+        return self.router.candidates() + [(None, self.engine)]
+
+    def _replica_down(self, session, key, last, load=None):
+        """
+        Obtiene la conexión de `session` y, si se da, ejecuta `load(session)`.
+        Regresa (True, None) si la réplica `key` no responde y se expulsó, o
+        (False, resultado). Sólo un fallo de conexión expulsa la réplica: los
+        errores de la consulta (tabla inexistente, timeout) se propagan en lugar
+        de repetir la consulta en el primario.
+        """
+        try:
+            session.connection()
+        except (OperationalError, InterfaceError, DataBaseUnavailable) as e:
+            if last:
+                raise
+            self.router.eject(key, getattr(e, "orig", e))
+            return True, None
+        try:
+            return False, load(session) if load is not None else None
+        except DBAPIError as e:
+            # La conexión se perdió a media consulta: también es una réplica caída
+            if last or not e.connection_invalidated:
+                raise
+            self.router.eject(key, e.orig)
+            return True, None
+
+    def _read(self, load):
+        """Ejecuta `load(session)` en una réplica; si falla la conexión se expulsa y se intenta la siguiente."""
+        engines = self._read_engines()
+        for i, (key, engine) in enumerate(engines):
+            session = self.Session(bind=engine)
+            try:
+                down, result = self._replica_down(session, key, key is None or i == len(engines) - 1, load)
+                if down:
+                    continue
+                if self.stats:
+                    DBStats.add_rows(engine, len(result) if isinstance(result, list) else int(result is not None))
+                return result
+            finally:
+                session.close()
+
+    def _after_write(self, table_class):
+        self._last_write = time.monotonic()
+        self.invalidate_cache(table_class)
 
     def create_table(self, model_class):
         if not self._database_ready:
-            raise DataBaseFail("Base de datos no conectada.")
+            raise self._not_ready_error()
         if not self.engine:
             self.connect()
-        model_class.__table__.create(self.engine, checkfirst=True)
+        if model_class.__tablename__ in self._known_tables():
+            return
+        self._create_tables([model_class.__table__])
         logger.info(f"Tabla '{model_class.__tablename__}' creada o ya existente.")
-        
-    def create_tables(self):
-            if not self._database_ready:
-                raise DataBaseFail("Base de datos no conectada.")
-            if not self.engine:
-                self.connect()
-            Base.metadata.create_all(self.engine)
-            logger.info("Tablas creadas o ya existentes.")
+
+    def create_tables(self, *model_classes):
+        """
+        Crea las tablas de `model_classes` (o todas las de Base.metadata) con una
+        sola consulta al catálogo para las que aún no se han verificado.
+        """
+        if not self._database_ready:
+            raise self._not_ready_error()
+        if not self.engine:
+            self.connect()
+        if model_classes:
+            tables = [m.__table__ for m in model_classes]
+        else:
+            tables = list(Base.metadata.sorted_tables)
+        self._create_tables(tables)
+        logger.info("Tablas creadas o ya existentes.")
+
+    def _known_tables(self):
+        with BaseDBManager._verified_lock:
+            return BaseDBManager._verified_tables.setdefault(self._pool_key(), set())
+
+    def _create_tables(self, tables):
+        known = self._known_tables()
+        pending = [t for t in tables if t.name not in known]
+        if not pending:
+            return
+        with self.engine.begin() as conn:
+            existing = set(inspect(conn).get_table_names())
+            missing = [t for t in pending if t.name not in existing]
+            if missing:
+                Base.metadata.create_all(conn, tables=missing, checkfirst=False)
+        with BaseDBManager._verified_lock:
+            known.update(t.name for t in pending)
+
+    def refresh_tables(self):
+        """Olvida las tablas verificadas para este destino (p. ej. tras un DROP externo)."""
+        with BaseDBManager._verified_lock:
+            BaseDBManager._verified_tables.pop(self._pool_key(), None)
 
     def add_record(self, record):
         if not self._database_ready:
-            raise DataBaseFail("Base de datos no conectada.")
+            raise self._not_ready_error()
         session = self.Session()
         try:
             session.add(record)
@@ -57,19 +376,229 @@ class BaseDBManager:
             raise
         finally:
             session.close()
+            self._after_write(type(record))
+
+    @staticmethod
+    def _chunks(records, chunk_size):
+        lote = []
+        for record in records:
+            lote.append(record)
+            if len(lote) >= chunk_size:
+                yield lote
+                lote = []
+        if lote:
+            yield lote
+
+    @staticmethod
+    def _bulk_rows(table, chunk):
+        """
+        Convierte un lote de diccionarios en (columnas, tuplas) para las rutas
+        DBAPI nativas, aplicando los defaults de Python de las columnas omitidas.
+        Los defaults SQL (`func.now()`) y las secuencias no pueden viajar como
+        valores: esas columnas se dejan al servidor (server_default o identidad)
+        y, si éste no tiene cómo llenarlas, se rechaza la carga.
+        """
+        columns = []
+        for c in table.columns:
+            if c.name in chunk[0]:
+                columns.append(c)
+            elif c.default is None:
+                continue
+            elif c.default.is_clause_element or c.default.is_sequence:
+                if c.server_default is None and c is not table.autoincrement_column:
+                    raise ValueError(
+                        f"La columna '{c.name}' de '{table.name}' tiene un default SQL que la carga "
+                        "masiva no puede evaluar: inclúyala en los registros o use server_default."
+                    )
+            else:
+                columns.append(c)
+        rows = []
+        for record in chunk:
+            row = []
+            for c in columns:
+                if c.name in record:
+                    row.append(record[c.name])
+                elif c.default.is_callable:
+                    row.append(c.default.arg(None))
+                else:
+                    row.append(c.default.arg)
+            rows.append(tuple(row))
+        return [c.name for c in columns], rows
 
-    def get_records(self, table_class):
+    def add_records(self, table_class, records, chunk_size=5000, log_errors=True):
+        """
+        Inserta un iterable de diccionarios en lotes de `chunk_size`, cada lote
+        en una sola transacción (executemany). Regresa el número de filas
+        insertadas. `log_errors=False` deja el reporte del error a quien llama.
+        """
         if not self._database_ready:
-            raise DataBaseFail("Base de datos no conectada.")
-        session = self.Session()
+            raise self._not_ready_error()
+        if not self.engine:
+            self.connect()
+        stmt = insert(table_class)
+        total = 0
         try:
-            return session.query(table_class).all()
+            for lote in self._chunks(records, chunk_size):
+                with self.engine.begin() as conn:
+                    conn.execute(stmt, lote)
+                total += len(lote)
+        except Exception as e:
+            if log_errors:
+                logger.error(f"Error al agregar registros en '{table_class.__tablename__}': {getattr(e, 'orig', e)}")
+            raise
         finally:
-            session.close()
+            self._after_write(table_class)
+        return total
+
+    def bulk_load(self, table_class, records, chunk_size=10000):
+        """
+        Carga masiva con la ruta nativa del dialecto (ver `_bulk_load` en cada
+        gestor). `records` es un iterable de diccionarios con las mismas llaves.
+        """
+        if not self._database_ready:
+            raise self._not_ready_error()
+        if not self.engine:
+            self.connect()
+        try:
+            total = self._bulk_load(table_class.__table__, self._chunks(records, chunk_size))
+        except Exception as e:
+            logger.error(f"Error en carga masiva de '{table_class.__tablename__}': {e}")
+            raise
+        finally:
+            self._after_write(table_class)
+        logger.info(f"Carga masiva de {total} registros en '{table_class.__tablename__}'.")
+        return total
+
+    def _bulk_load(self, table, chunks):
+        total = 0
+        for chunk in chunks:
+            with self.engine.begin() as conn:
+                conn.execute(insert(table), chunk)
+            total += len(chunk)
+        return total
+
+    def invalidate_cache(self, table_class=None):
+        """Descarta las lecturas en caché de `table_class` (o de todo el destino)."""
+        if self.cache is not None:
+            self.cache.invalidate(table_class.__tablename__ if table_class is not None else None)
+
+    def _cached(self, key, loader):
+        if self.cache is None:
+            return loader()
+        return self.cache.get_or_load(key, loader)
+
+    def get_records(self, table_class, filters=None, columns=None):
+        """
+        Todos los registros (o los que cumplen `filters`, ver `_select`); con
+        `columns` regresa diccionarios en lugar de objetos ORM. Con la caché
+        activa el resultado se comparte entre llamadas: los objetos ORM
+        regresados están desligados de su sesión y no deben modificarse.
+        """
+        if not self._database_ready:
+            raise self._not_ready_error()
+
+        def load():
+            stmt = self._select(table_class, columns, filters)
+            return self._read(lambda session: list(self._rows(session.execute(stmt), columns, True)))
+
+        key = (table_class.__tablename__, "records", _freeze(filters), _freeze(columns))
+        return list(self._cached(key, load))
+
+    def get_record(self, table_class, record_id):
+        """Registro por llave primaria (tupla para llaves compuestas), o None."""
+        if not self._database_ready:
+            raise self._not_ready_error()
+
+        def load():
+            return self._read(lambda session: session.get(table_class, record_id))
+
+        return self._cached((table_class.__tablename__, "pk", _freeze(record_id)), load)
+
+    @staticmethod
+    def _select(table_class, columns=None, filters=None):
+        """
+        SELECT de la entidad completa o sólo de `columns`. `filters` es un
+        diccionario columna -> valor (o lista de valores para IN).
+        """
+        stmt = select(*[getattr(table_class, c) for c in columns]) if columns else select(table_class)
+        for name, value in (filters or {}).items():
+            column = getattr(table_class, name)
+            if isinstance(value, (list, tuple, set)):
+                stmt = stmt.where(column.in_(list(value)))
+            else:
+                stmt = stmt.where(column == value)
+        return stmt
+
+    @staticmethod
+    def _rows(result, columns, as_dict):
+        if not columns:
+            return result.scalars()
+        if as_dict:
+            return (row._asdict() for row in result)
+        return (tuple(row) for row in result)
+
+    def stream_records(self, table_class, columns=None, filters=None, chunk_size=1000, as_dict=False):
+        """
+        Genera los registros con un cursor del lado del servidor (yield_per),
+        sin materializar la tabla completa. Con `columns` produce tuplas (o
+        diccionarios con `as_dict`) en lugar de objetos ORM.
+        """
+        if not self._database_ready:
+            raise self._not_ready_error()
+        if not self.engine:
+            self.connect()
+        stmt = self._select(table_class, columns, filters).execution_options(yield_per=chunk_size)
+        engines = self._read_engines()
+        for i, (key, engine) in enumerate(engines):
+            session = self.Session(bind=engine)
+            rows = 0
+            try:
+                # Sólo se cambia de réplica si falla la conexión antes de producir filas
+                down, result = self._replica_down(session, key, key is None or i == len(engines) - 1,
+                                                  lambda s: s.execute(stmt))
+                if down:
+                    continue
+                for row in self._rows(result, columns, as_dict):
+                    rows += 1
+                    yield row
+                return
+            finally:
+                session.close()
+                if self.stats:
+                    DBStats.add_rows(engine, rows)
+
+    def get_page(self, table_class, after=None, limit=100, columns=None, filters=None, as_dict=False):
+        """
+        Paginación por llave (keyset): regresa hasta `limit` registros cuya llave
+        primaria es mayor que `after`, ordenados por ella. Para llaves compuestas
+        `after` es una tupla con el mismo orden de columnas.
+        """
+        if not self._database_ready:
+            raise self._not_ready_error()
+        if not self.engine:
+            self.connect()
+        pk = list(table_class.__table__.primary_key.columns)
+        stmt = self._select(table_class, columns, filters).order_by(*pk).limit(limit)
+        if after is not None:
+            stmt = stmt.where(self._after_key(pk, after))
+        return self._read(lambda session: list(self._rows(session.execute(stmt), columns, as_dict)))
+
+    @staticmethod
+    def _after_key(pk, after):
+        """
+        Llave mayor que `after`. Las compuestas se expanden a
+        a > x OR (a = x AND b > y) ...: SQL Server no compara tuplas.
+        """
+        if len(pk) == 1:
+            return pk[0] > after
+        return or_(*[
+            and_(*[c == v for c, v in zip(pk[:i], after[:i])], pk[i] > after[i])
+            for i in range(len(pk))
+        ])
 
     def update_record(self, table_class, record_id, **kwargs):
         if not self._database_ready:
-            raise DataBaseFail("Base de datos no conectada.")
+            raise self._not_ready_error()
         session = self.Session()
         try:
             record = session.get(table_class, record_id)
@@ -82,10 +611,11 @@ class BaseDBManager:
             logger.info(f"Error al actualizar registro: {e}")
         finally:
             session.close()
+            self._after_write(table_class)
 
     def delete_record(self, table_class, record_id):
         if not self._database_ready:
-            raise DataBaseFail("Base de datos no conectada.")
+            raise self._not_ready_error()
         session = self.Session()
         try:
             record = session.get(table_class, record_id)
@@ -97,12 +627,77 @@ class BaseDBManager:
             logger.info(f"Error al eliminar registro: {e}")
         finally:
             session.close()
+            self._after_write(table_class)
+
+    def _pk_in(self, table_class, ids):
+        pk = list(table_class.__table__.primary_key.columns)
+        if len(pk) == 1:
+            return pk[0].in_(ids)
+        # OR de un AND por llave: SQL Server no acepta (a, b) IN (...)
+        return or_(*[and_(*[c == v for c, v in zip(pk, i)]) for i in ids])
+
+    @staticmethod
+    def _pk_chunk_size(table_class, chunk_size, extra=0):
+        """Llaves por sentencia sin rebasar MAX_PARAMS (cada llave usa un parámetro por columna)."""
+        columns = len(table_class.__table__.primary_key.columns)
+        return max(1, min(chunk_size, (MAX_PARAMS - extra) // columns))
+
+    def update_many(self, table_class, ids, chunk_size=1000, **values):
+        """
+        UPDATE ... WHERE pk IN (...) en lotes de `chunk_size` llaves (menos si la
+        llave compuesta rebasaría MAX_PARAMS), todo en una transacción. Regresa
+        el número de filas afectadas.
+        """
+        if not self._database_ready:
+            raise self._not_ready_error()
+        if not self.engine:
+            self.connect()
+        ids = list(ids)
+        chunk_size = self._pk_chunk_size(table_class, chunk_size, len(values))
+        total = 0
+        try:
+            with self.engine.begin() as conn:
+                for i in range(0, len(ids), chunk_size):
+                    stmt = update(table_class).where(self._pk_in(table_class, ids[i:i + chunk_size])).values(**values)
+                    total += conn.execute(stmt).rowcount
+        except Exception as e:
+            logger.error(f"Error al actualizar registros de '{table_class.__tablename__}': {e}")
+            raise
+        finally:
+            self._after_write(table_class)
+        return total
+
+    def delete_many(self, table_class, ids, chunk_size=1000):
+        """DELETE ... WHERE pk IN (...) en lotes, en una transacción. Regresa las filas borradas."""
+        if not self._database_ready:
+            raise self._not_ready_error()
+        if not self.engine:
+            self.connect()
+        ids = list(ids)
+        chunk_size = self._pk_chunk_size(table_class, chunk_size)
+        total = 0
+        try:
+            with self.engine.begin() as conn:
+                for i in range(0, len(ids), chunk_size):
+                    stmt = delete(table_class).where(self._pk_in(table_class, ids[i:i + chunk_size]))
+                    total += conn.execute(stmt).rowcount
+        except Exception as e:
+            logger.error(f"Error al eliminar registros de '{table_class.__tablename__}': {e}")
+            raise
+        finally:
+            self._after_write(table_class)
+        return total
 
     def close(self):
         if self.engine:
-            self.engine.dispose()
+            # Un engine del registro es compartido: sólo se suelta la referencia
+            if not self.pooled:
+                self.engine.dispose()
+                for _, engine in (self.router.replicas if self.router else []):
+                    engine.dispose()
             self.engine = None
             self.Session = None
+            self.router = None
         logger.info("¡Conexión cerrada!")
 
     def __enter__(self):
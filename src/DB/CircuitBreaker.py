@@ -0,0 +1,87 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), ".")))
+
+import time
+import threading
+from src import LoggerFactory
+
+logger = LoggerFactory().get_logger("db", "db.log", consola=True)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Interruptor por destino de base de datos. Tras `failure_threshold` fallos
+    de conexión seguidos se abre y rechaza de inmediato durante `reset_timeout`
+    segundos; después deja pasar una sola prueba (half-open): si tiene éxito
+    se cierra, si falla vuelve a abrirse. Los interruptores son del proceso y
+    se comparten entre los gestores del mismo destino.
+    """
+
+    _breakers = {}
+    _breakers_lock = threading.Lock()
+
+    def __init__(self, failure_threshold=3, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_at = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_key(cls, key, **options):
+        breaker = cls._breakers.get(key)
+        if breaker is not None:
+            return breaker
+        with cls._breakers_lock:
+            return cls._breakers.setdefault(key, cls(**options))
+
+    def allow(self) -> bool:
+        """¿Puede intentarse una conexión? En half-open sólo la primera llamada obtiene True."""
+        now = time.monotonic()
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and now - self.opened_at < self.reset_timeout:
+                return False
+            # Vencido el plazo (o una prueba que nunca reportó): una sola prueba a la vez
+            if self.state == HALF_OPEN and now - self._trial_at < self.reset_timeout:
+                return False
+            self.state = HALF_OPEN
+            self._trial_at = now
+            return True
+
+    def retry_after(self) -> int:
+        with self._lock:
+            if self.state == CLOSED:
+                return 0
+            return max(1, int(self.reset_timeout - (time.monotonic() - self.opened_at)))
+
+    def success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info("Circuito de base de datos cerrado: destino disponible de nuevo.")
+            self.state = CLOSED
+            self.failures = 0
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                logger.warning(f"Circuito de base de datos abierto tras {self.failures} fallos; reintento en {self.reset_timeout}s.")
+
+    @classmethod
+    def status(cls):
+        with cls._breakers_lock:
+            breakers = dict(cls._breakers)
+        return {
+            f"{key[0]}://{key[1] or ''}/{key[2]}": {"state": b.state, "failures": b.failures}
+            for key, b in breakers.items()
+        }
@@ -2,7 +2,9 @@ import sys, os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
 
+from functools import partial
 from src import MSSQLDBManager, MySQLDBManager, PostgreSQLDBManager, SQLiteDBManager, LoggerFactory
+from src import AsyncBaseDBManager, AsyncExecutorDBManager
 
 
 # Obtener logger centralizado
@@ -25,3 +27,19 @@ class DBFactory:
         else:
             db_logger.error(f"Tipo de base de datos no soportado: {db_type}")
             raise ValueError(f"Tipo de base de datos no soportado: {db_type}")
+
+    @staticmethod
+    def get_async(db_type: str, db_name: str, **kwargs):
+        """
+        Gestor asyncio para rutas `async def`. MSSQL (pyodbc) no tiene driver
+        asyncio y se atiende con el gestor síncrono en un pool de hilos.
+        """
+        db_type = db_type.lower()
+        if db_type not in ("mssql", "mysql", "postgresql", "pg", "sqlite"):
+            db_logger.error(f"Tipo de base de datos no soportado: {db_type}")
+            raise ValueError(f"Tipo de base de datos no soportado: {db_type}")
+
+        factory = partial(DBFactory.get, db_type, db_name, **kwargs)
+        if db_type == "mssql":
+            return AsyncExecutorDBManager(factory)
+        return AsyncBaseDBManager(factory)
@@ -0,0 +1,78 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), ".")))
+
+import asyncio
+import threading
+from sqlalchemy import create_engine
+from src import LoggerFactory
+
+logger = LoggerFactory().get_logger("db", "db.log", consola=True)
+
+
+class EngineRegistry:
+    """
+    Engines compartidos por todo el proceso, uno por destino
+    (dialecto, host, base, usuario). Los gestores creados en cada petición
+    reutilizan el pool de conexiones en lugar de abrir uno nuevo; los engines
+    sólo se liberan con `dispose`/`dispose_all` (p. ej. al apagar la API).
+    """
+
+    _engines = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, key, uri, factory=create_engine, **engine_options):
+        engine = cls._engines.get(key)
+        if engine is not None:
+            return engine
+        with cls._lock:
+            engine = cls._engines.get(key)
+            if engine is None:
+                engine = factory(uri, **engine_options)
+                cls._engines[key] = engine
+                logger.info(f"Engine registrado para {key[0]}://{key[1] or ''}/{key[2]}.")
+        return engine
+
+    @classmethod
+    def dispose(cls, key):
+        with cls._lock:
+            engine = cls._engines.pop(key, None)
+        if engine is not None:
+            cls._dispose(engine)
+
+    @classmethod
+    def dispose_all(cls):
+        with cls._lock:
+            engines, cls._engines = cls._engines, {}
+        for engine in engines.values():
+            cls._dispose(engine)
+        logger.info(f"{len(engines)} engines liberados.")
+
+    @classmethod
+    async def dispose_all_async(cls):
+        """Como `dispose_all`, pero cerrando las conexiones asyncio dentro del event loop."""
+        with cls._lock:
+            engines, cls._engines = cls._engines, {}
+        for engine in engines.values():
+            if hasattr(engine, "sync_engine"):
+                await engine.dispose()
+            else:
+                engine.dispose()
+        logger.info(f"{len(engines)} engines liberados.")
+
+    @staticmethod
+    def _dispose(engine):
+        if not hasattr(engine, "sync_engine"):
+            engine.dispose()
+            return
+        # Un AsyncEngine sólo puede cerrar sus conexiones desde un event loop
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(engine.dispose())
+        else:
+            engine.sync_engine.dispose(close=False)
+
+    @classmethod
+    def keys(cls):
+        return list(cls._engines)
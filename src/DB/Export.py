@@ -0,0 +1,174 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), ".")))
+
+import io
+import csv
+import json
+import tempfile
+import itertools
+from datetime import date, datetime
+from decimal import Decimal
+from sqlalchemy import text
+from src import LoggerFactory, DBStats
+
+logger = LoggerFactory().get_logger("db", "db.log", consola=True)
+
+# formato -> (media type, extensión)
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+}
+
+XLSX_MAX_ROWS = 1048576  # Límite de filas por hoja de Excel (incluye encabezado)
+
+
+def _texto(value):
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _json(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return value.hex()
+    return str(value)
+
+
+class Exporter:
+    """
+    Exporta tablas de `modelos/` o consultas SQL como un iterador de bloques de
+    bytes, listo para un StreamingResponse. Las filas se leen con cursor del
+    lado del servidor (`stream_records`) en lotes de `chunk_size`; CSV y NDJSON
+    nunca retienen más de un lote, XLSX usa el modo `constant_memory` de
+    XlsxWriter sobre un archivo temporal. Las columnas marcadas con
+    `info={"sensitive": True}` sólo se exportan si se piden explícitamente.
+    """
+
+    def __init__(self, db, chunk_size=1000):
+        self.db = db
+        self.chunk_size = chunk_size
+
+    def table(self, table_class, fmt="csv", columns=None, filters=None):
+        """
+        La consulta se ejecuta (y se lee su primera fila) al llamar, de modo que
+        sus errores surgen antes de enviar los encabezados de la respuesta.
+        """
+        self._check_format(fmt)
+        if not columns:
+            columns = [c.name for c in table_class.__table__.columns if not c.info.get("sensitive")]
+        columns = list(columns)
+        rows = self.db.stream_records(table_class, columns=columns, filters=filters, chunk_size=self.chunk_size)
+        first = next(rows, None)
+        if first is not None:
+            rows = itertools.chain([first], rows)
+        return self._render(fmt, columns, rows)
+
+    def query(self, sql, fmt="csv", params=None):
+        """Exporta el resultado de una consulta SQL (sólo lectura) con parámetros enlazados."""
+        self._check_format(fmt)
+        if not self.db.engine:
+            self.db.connect()
+        _, engine = self.db._read_engines()[0]
+        with engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=self.chunk_size).execute(
+                text(sql), params or {}
+            )
+            rows = [0]
+
+            def contar():
+                for row in result:
+                    rows[0] += 1
+                    yield tuple(row)
+
+            try:
+                yield from self._render(fmt, list(result.keys()), contar())
+            finally:
+                DBStats.add_rows(engine, rows[0])
+
+    @staticmethod
+    def _check_format(fmt):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Formato de exportación no soportado: {fmt}")
+
+    def _render(self, fmt, columns, rows):
+        self._check_format(fmt)
+        if fmt == "csv":
+            return self._csv(columns, rows)
+        if fmt == "ndjson":
+            return self._ndjson(columns, rows)
+        return self._xlsx(columns, rows)
+
+    def _csv(self, columns, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        buffer.write("\ufeff")  # BOM: Excel abre el CSV como UTF-8
+        writer.writerow(columns)
+        for i, row in enumerate(rows, start=1):
+            writer.writerow([_texto(v) for v in row])
+            if i % self.chunk_size == 0:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode("utf-8")
+
+    def _ndjson(self, columns, rows):
+        lines = []
+        for row in rows:
+            lines.append(json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=_json))
+            if len(lines) >= self.chunk_size:
+                yield ("\n".join(lines) + "\n").encode("utf-8")
+                lines = []
+        if lines:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+
+    def _xlsx(self, columns, rows):
+        import xlsxwriter
+
+        # constant_memory escribe cada fila a disco en cuanto se completa, por
+        # eso requiere un archivo y no admite `in_memory`.
+        fd, path = tempfile.mkstemp(suffix=".xlsx")
+        os.close(fd)
+        try:
+            workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+            date_format = workbook.add_format({"num_format": "yyyy-mm-dd hh:mm:ss"})
+            sheet, r = None, XLSX_MAX_ROWS
+            for row in rows:
+                if r >= XLSX_MAX_ROWS:
+                    # Más filas de las que admite una hoja: se continúa en otra
+                    sheet = workbook.add_worksheet()
+                    sheet.write_row(0, 0, columns)
+                    r = 1
+                for c, value in enumerate(row):
+                    if value is None:
+                        continue
+                    if isinstance(value, datetime):
+                        sheet.write_datetime(r, c, value.replace(tzinfo=None), date_format)
+                    elif isinstance(value, date):
+                        sheet.write_datetime(r, c, datetime(value.year, value.month, value.day), date_format)
+                    elif isinstance(value, Decimal):
+                        sheet.write_number(r, c, float(value))
+                    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                        sheet.write_number(r, c, value)
+                    else:
+                        sheet.write_string(r, c, str(value))
+                r += 1
+            if sheet is None:
+                workbook.add_worksheet().write_row(0, 0, columns)
+            workbook.close()
+
+            with open(path, "rb") as f:
+                while True:
+                    block = f.read(1 << 16)
+                    if not block:
+                        break
+                    yield block
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                logger.warning(f"No se pudo eliminar el temporal de exportación '{path}'.")
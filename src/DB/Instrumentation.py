@@ -0,0 +1,184 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), ".")))
+
+import time
+import bisect
+import threading
+import weakref
+from functools import wraps
+from sqlalchemy import event
+from src import LoggerFactory
+
+logger = LoggerFactory().get_logger("db", "db.log", consola=True)
+
+# Límites superiores (ms) de las cubetas de los histogramas
+BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class _Histogram:
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)  # La última cubeta es "> 5000"
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        self.buckets[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def snapshot(self):
+        labels = [f"<={b}" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}"]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "buckets_ms": dict(zip(labels, self.buckets)),
+        }
+
+
+class _TargetStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {"checkout": _Histogram(), "query": _Histogram(), "commit": _Histogram()}
+        self.rows = 0  # Afectadas por INSERT/UPDATE/DELETE (rowcount)
+        self.returned = 0  # Leídas por los gestores (ver `DBStats.add_rows`)
+        self.errors = 0
+        self.slow = 0
+        self.connections = 0
+        self.engines = weakref.WeakSet()
+
+    def add(self, kind, ms):
+        with self.lock:
+            self.histograms[kind].add(ms)
+
+
+class DBStats:
+    """
+    Métricas por destino de engine obtenidas con eventos de SQLAlchemy:
+    espera al tomar una conexión del pool, latencia y filas afectadas por
+    sentencia, duración de los COMMIT y ocupación del pool. Las sentencias que
+    tardan más de `slow_ms` se registran en db.log. Las filas regresadas por
+    un SELECT no se conocen al ejecutarlo (rowcount -1): las reportan los
+    gestores con `add_rows` al terminar de leerlas.
+    """
+
+    _targets = {}
+    _by_engine = weakref.WeakKeyDictionary()  # engine -> _TargetStats
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _label(engine):
+        url = engine.url
+        return f"{url.drivername}://{url.host or ''}/{url.database or ''}"
+
+    @classmethod
+    def _target(cls, label):
+        with cls._lock:
+            return cls._targets.setdefault(label, _TargetStats())
+
+    @classmethod
+    def instrument(cls, engine, slow_ms=500, label=None):
+        """`label` identifica el destino (p. ej. el de `BaseDBManager._url_key`); por omisión se toma de la URL."""
+        label = label or cls._label(engine)
+        stats = cls._target(label)
+        with stats.lock:
+            if engine in stats.engines:
+                return engine
+            stats.engines.add(engine)
+        with cls._lock:
+            cls._by_engine[engine] = stats
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            ms = (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+            # En un SELECT la mayoría de los drivers no conoce las filas hasta leerlas (rowcount -1)
+            rowcount = getattr(cursor, "rowcount", -1)
+            with stats.lock:
+                stats.histograms["query"].add(ms)
+                if rowcount and rowcount > 0:
+                    stats.rows += rowcount
+                if ms >= slow_ms:
+                    stats.slow += 1
+            if ms >= slow_ms:
+                logger.warning(f"Consulta lenta ({ms:.1f} ms) en {label}: {' '.join(statement.split())[:500]}")
+
+        @event.listens_for(engine, "handle_error")
+        def handle_error(exception_context):
+            conn = exception_context.connection
+            if conn is not None and conn.info.get("query_start"):
+                conn.info["query_start"].pop()
+            with stats.lock:
+                stats.errors += 1
+
+        @event.listens_for(engine, "connect")
+        def connect(dbapi_connection, connection_record):
+            with stats.lock:
+                stats.connections += 1
+
+        # Ni el pool ni el dialecto tienen eventos "antes/después" para el
+        # checkout y el COMMIT: se envuelven los métodos de estas instancias.
+        engine.pool.connect = cls._timed(engine.pool.connect, stats, "checkout")
+        engine.dialect.do_commit = cls._timed(engine.dialect.do_commit, stats, "commit")
+        return engine
+
+    @classmethod
+    def add_rows(cls, engine, rows):
+        """Suma las filas leídas de un SELECT ejecutado en `engine` (si está instrumentado)."""
+        stats = cls._by_engine.get(getattr(engine, "sync_engine", engine))
+        if stats is not None and rows:
+            with stats.lock:
+                stats.returned += rows
+
+    @staticmethod
+    def _timed(func, stats, kind):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stats.add(kind, (time.perf_counter() - start) * 1000)
+        return wrapper
+
+    @staticmethod
+    def _pool_status(engine):
+        pool = engine.pool
+        status = {"class": type(pool).__name__, "status": pool.status()}
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            if hasattr(pool, name):
+                status[name] = getattr(pool, name)()
+        return status
+
+    @classmethod
+    def snapshot(cls):
+        with cls._lock:
+            targets = dict(cls._targets)
+        result = {}
+        for label, stats in targets.items():
+            with stats.lock:
+                result[label] = {
+                    **{kind: h.snapshot() for kind, h in stats.histograms.items()},
+                    "rows_affected": stats.rows,
+                    "rows_returned": stats.returned,
+                    "errors": stats.errors,
+                    "slow_queries": stats.slow,
+                    "connections_opened": stats.connections,
+                    "pools": [cls._pool_status(e) for e in list(stats.engines)],
+                }
+        return result
+
+    @classmethod
+    def reset(cls):
+        """Reinicia los contadores; los engines ya instrumentados siguen reportando."""
+        with cls._lock:
+            targets = list(cls._targets.values())
+        for stats in targets:
+            with stats.lock:
+                stats.histograms = {kind: _Histogram() for kind in stats.histograms}
+                stats.rows = stats.returned = stats.errors = stats.slow = stats.connections = 0
@@ -2,9 +2,11 @@ import sys, os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
 
-from BaseDBM import BaseDBManager
+from .BaseDBM import BaseDBManager
 import urllib
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool
 from dotenv import load_dotenv
 from src import LoggerFactory
 
@@ -20,7 +22,7 @@ class MSSQLDBManager(BaseDBManager):
         self.password = kwargs.get("password", os.getenv("dbPasswd"))
         self.database = db_name
         uri = self._build_uri()
-        super().__init__(uri)
+        super().__init__(uri, **kwargs)
 
     def _build_uri(self):
         connection_string = (
@@ -35,7 +37,40 @@ class MSSQLDBManager(BaseDBManager):
         )
         return f"mssql+pyodbc:///?odbc_connect={urllib.parse.quote_plus(connection_string)}"
 
+    @staticmethod
+    def _odbc_params(uri):
+        # La URI odbc_connect no expone host/base/usuario a make_url: se leen de la cadena ODBC
+        odbc = make_url(uri).query.get("odbc_connect")
+        if not odbc:
+            return None
+        params = {}
+        for param in odbc.split(";"):
+            name, _, value = param.partition("=")
+            params[name.strip().upper()] = value.strip()
+        return params
+
+    def _url_key(self, uri):
+        params = self._odbc_params(uri)
+        if params is None:
+            return super()._url_key(uri)
+        return ("mssql", params.get("SERVER"), params.get("DATABASE"), params.get("UID"))
+
+    def _url_endpoint(self, uri):
+        params = self._odbc_params(uri)
+        if params is None:
+            return super()._url_endpoint(uri)
+        if not params.get("SERVER"):
+            return None
+        host, _, port = params["SERVER"].partition(",")
+        return host, int(port or 1433)
+
+    def _endpoint(self):
+        if not self.server:
+            return None
+        return self.server, self.port
+
     def _check_or_create_database(self):
+        temp_engine = None
         try:
             connection_string = (
                 f"DRIVER={{ODBC Driver 18 for SQL Server}};"
@@ -48,7 +83,7 @@ class MSSQLDBManager(BaseDBManager):
                 "Connection Timeout=30;"
             )
             master_uri = f"mssql+pyodbc:///?odbc_connect={urllib.parse.quote_plus(connection_string)}"
-            temp_engine = create_engine(master_uri)
+            temp_engine = create_engine(master_uri, poolclass=NullPool)
 
             with temp_engine.connect() as conn:
                 result = conn.execute(
@@ -66,3 +101,31 @@ class MSSQLDBManager(BaseDBManager):
         except Exception as e:
             logger.error(f"ERROR al verificar o crear la base: {e}")
             return False
+        finally:
+            if temp_engine is not None:
+                temp_engine.dispose()
+
+    def _bulk_load(self, table, chunks):
+        # pyodbc con fast_executemany envía cada lote como un solo arreglo de parámetros
+        preparer = self.engine.dialect.identifier_preparer
+        raw = self.engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            cursor.fast_executemany = True
+            total = 0
+            for chunk in chunks:
+                columns, rows = self._bulk_rows(table, chunk)
+                sql = (
+                    f"INSERT INTO {preparer.format_table(table)} "
+                    f"({', '.join(preparer.quote(c) for c in columns)}) "
+                    f"VALUES ({', '.join('?' for _ in columns)})"
+                )
+                cursor.executemany(sql, rows)
+                raw.commit()
+                total += len(rows)
+            return total
+        except Exception:
+            raw.rollback()
+            raise
+        finally:
+            raw.close()
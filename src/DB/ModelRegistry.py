@@ -0,0 +1,84 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), ".")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+import json
+import importlib
+import threading
+from pathlib import Path
+from src import LoggerFactory
+from .BaseDBM import Base
+
+logger = LoggerFactory().get_logger("db", "db.log", consola=True)
+
+MODELOS_PATH = Path(__file__).resolve().parents[2] / "modelos"
+
+
+class ModelRegistry:
+    """
+    Índice nombre -> modelo construido una vez desde `Base.registry` (los
+    mismos modelos que reúne scripts/buil_init_modelos.py). Las rutas lo
+    consultan en O(1) en lugar de recorrer e importar `modelos/` en cada
+    petición; `reload` importa los archivos agregados después del arranque.
+    """
+
+    _models = {}
+    _listing = None  # JSON ya serializado de la lista de modelos
+    _loaded = False
+    _lock = threading.Lock()
+
+    @classmethod
+    def _import_modelos(cls):
+        importlib.import_module("modelos")
+        for archivo in sorted(MODELOS_PATH.glob("*.py")):
+            if archivo.name.startswith("_"):
+                continue
+            modulo = f"modelos.{archivo.stem}"
+            if modulo in sys.modules:
+                continue
+            try:
+                importlib.import_module(modulo)
+            except Exception as e:
+                logger.warning(f"No se pudo cargar modelo desde {modulo}: {e}")
+
+    @classmethod
+    def load(cls):
+        with cls._lock:
+            cls._import_modelos()
+            models = {}
+            for mapper in Base.registry.mappers:
+                model = mapper.class_
+                models[model.__name__] = model
+                # También por nombre de tabla, si no choca con un nombre de clase
+                models.setdefault(model.__tablename__, model)
+            names = sorted(m.class_.__name__ for m in Base.registry.mappers)
+            cls._models = models
+            cls._listing = json.dumps({"status": "ok", "modelos_disponibles": names}, ensure_ascii=False).encode("utf-8")
+            cls._loaded = True
+        logger.info(f"Registro de modelos: {len(names)} modelos.")
+        return names
+
+    @classmethod
+    def reload(cls):
+        """Importa los modelos nuevos de `modelos/` y reconstruye el índice."""
+        return cls.load()
+
+    @staticmethod
+    def modelo(name):
+        """
+        Clase de `modelos/` importada al pedirla y no al cargar el módulo que
+        la usa: modelos/ depende de `src`, que a su vez importa los servicios SAT.
+        """
+        return getattr(importlib.import_module("modelos"), name)
+
+    @classmethod
+    def get(cls, name):
+        if not cls._loaded:
+            cls.load()
+        return cls._models.get(name)
+
+    @classmethod
+    def listing(cls) -> bytes:
+        if not cls._loaded:
+            cls.load()
+        return cls._listing
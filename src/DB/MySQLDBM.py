@@ -1,9 +1,11 @@
 import sys, os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from BaseDBM import BaseDBManager
+from .BaseDBM import BaseDBManager
 import os
 from sqlalchemy import create_engine, text
+from sqlalchemy.dialects.mysql import insert
+from sqlalchemy.pool import NullPool
 from dotenv import load_dotenv
 from src import LoggerFactory
 
@@ -19,20 +21,36 @@ class MySQLDBManager(BaseDBManager):
         self.port = int(kwargs.get("port", os.getenv("MYSQL_PORT", 3306)))
         self.database = db_name
         uri = self._build_uri()
-        super().__init__(uri)
+        super().__init__(uri, **kwargs)
 
     def _build_uri(self):
         return f"mysql+pymysql://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}"
 
     def _check_or_create_database(self):
+        temp_engine = None
         try:
             root_uri = f"mysql+pymysql://{self.user}:{self.password}@{self.host}:{self.port}/"
-            temp_engine = create_engine(root_uri)
+            temp_engine = create_engine(root_uri, poolclass=NullPool)
             with temp_engine.connect() as conn:
-                conn.execute(f"CREATE DATABASE IF NOT EXISTS {self.database}")
+                conn.execute(text(f"CREATE DATABASE IF NOT EXISTS `{self.database}`"))
             logger.info(f"Base de datos '{self.database}' verificada o creada.")
             return True
         except Exception as e:
             logger.error(f"ERROR al verificar o crear base MySQL: {e}")
             return False
+        finally:
+            if temp_engine is not None:
+                temp_engine.dispose()
 
+    def _bulk_load(self, table, chunks):
+        # Un solo INSERT multi-fila por lote; las llaves existentes se actualizan
+        llaves = {c.name for c in table.primary_key.columns}
+        total = 0
+        for chunk in chunks:
+            stmt = insert(table).values(chunk)
+            valores = {c: stmt.inserted[c] for c in chunk[0] if c not in llaves}
+            stmt = stmt.on_duplicate_key_update(valores or {c: stmt.inserted[c] for c in llaves})
+            with self.engine.begin() as conn:
+                conn.execute(stmt)
+            total += len(chunk)
+        return total
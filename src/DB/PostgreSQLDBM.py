@@ -1,9 +1,12 @@
 import sys, os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from BaseDBM import BaseDBManager
+from .BaseDBM import BaseDBManager
 import os
+import io
+import csv
 from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
 from dotenv import load_dotenv
 from src import LoggerFactory
 
@@ -19,19 +22,25 @@ class PostgreSQLDBManager(BaseDBManager):
         self.port = int(kwargs.get("port", os.getenv("PG_PORT", 5432)))
         self.database = db_name
         uri = self._build_uri()
-        super().__init__(uri)
+        super().__init__(uri, **kwargs)
 
     def _build_uri(self):
         return f"postgresql+psycopg2://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}"
 
     def _check_or_create_database(self):
+        temp_engine = None
         try:
             root_uri = f"postgresql+psycopg2://{self.user}:{self.password}@{self.host}:{self.port}/postgres"
-            temp_engine = create_engine(root_uri)
-            with temp_engine.connect() as conn:
-                conn.execution_options(isolation_level="AUTOCOMMIT").execute(
-                    f"CREATE DATABASE {self.database} WITH ENCODING 'UTF8'"
-                )
+            temp_engine = create_engine(root_uri, poolclass=NullPool)
+            with temp_engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                existe = conn.execute(
+                    text("SELECT 1 FROM pg_database WHERE datname = :db_name"),
+                    {"db_name": self.database}
+                ).fetchone()
+                if existe:
+                    logger.info(f"Base de datos '{self.database}' ya existe.")
+                    return True
+                conn.execute(text(f'CREATE DATABASE "{self.database}" WITH ENCODING \'UTF8\''))
             logger.info(f"Base de datos '{self.database}' creada.")
             return True
         except Exception as e:
@@ -40,3 +49,35 @@ class PostgreSQLDBManager(BaseDBManager):
                 return True
             logger.error(f"ERROR al verificar o crear base PostgreSQL: {e}")
             return False
+        finally:
+            if temp_engine is not None:
+                temp_engine.dispose()
+
+    def _bulk_load(self, table, chunks):
+        # COPY FROM STDIN en CSV; NULL se representa como \N para distinguirlo de ''
+        preparer = self.engine.dialect.identifier_preparer
+        raw = self.engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            total = 0
+            for chunk in chunks:
+                columns, rows = self._bulk_rows(table, chunk)
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                for row in rows:
+                    writer.writerow("\\N" if v is None else v for v in row)
+                buffer.seek(0)
+                cursor.copy_expert(
+                    f"COPY {preparer.format_table(table)} "
+                    f"({', '.join(preparer.quote(c) for c in columns)}) "
+                    "FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+                    buffer,
+                )
+                raw.commit()
+                total += len(rows)
+            return total
+        except Exception:
+            raw.rollback()
+            raise
+        finally:
+            raw.close()
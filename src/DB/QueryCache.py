@@ -0,0 +1,81 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), ".")))
+
+import time
+import threading
+from collections import OrderedDict
+
+
+class QueryCache:
+    """
+    Caché de resultados de lectura con TTL y límite LRU, una por base de datos
+    (ver `BaseDBManager._database_key`) y compartida por todo el proceso, de
+    modo que gestores del mismo destino en distinto modo comparten sus entradas.
+    Las llaves empiezan con el nombre de la tabla; cualquier escritura de los
+    gestores sobre esa tabla invalida sus entradas. Cada tabla lleva además un
+    contador de generación: un resultado leído antes de una escritura ya no se
+    guarda aunque la lectura termine después.
+    """
+
+    _caches = {}
+    _caches_lock = threading.Lock()
+
+    def __init__(self, max_entries=1024, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # llave -> (expira, valor)
+        self._by_table = {}
+        self._generations = {}
+        self._epoch = 0  # Se incrementa al invalidar toda la caché
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def for_key(cls, key, **options):
+        cache = cls._caches.get(key)
+        if cache is not None:
+            return cache
+        with cls._caches_lock:
+            return cls._caches.setdefault(key, cls(**options))
+
+    def get_or_load(self, key, loader):
+        table = key[0]
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = (self._epoch, self._generations.get(table, 0))
+
+        value = loader()
+
+        with self._lock:
+            if (self._epoch, self._generations.get(table, 0)) != generation:
+                return value
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            self._by_table.setdefault(table, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                old_key, _ = self._entries.popitem(last=False)
+                self._by_table.get(old_key[0], set()).discard(old_key)
+        return value
+
+    def invalidate(self, table=None):
+        """Descarta las entradas de `table` (nombre de tabla) o todas si es None."""
+        with self._lock:
+            if table is None:
+                self._epoch += 1
+                self._entries.clear()
+                self._by_table.clear()
+                return
+            self._generations[table] = self._generations.get(table, 0) + 1
+            for key in self._by_table.pop(table, ()):
+                self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,55 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), ".")))
+
+import time
+import threading
+from src import LoggerFactory
+
+logger = LoggerFactory().get_logger("db", "db.log", consola=True)
+
+
+class ReadRouter:
+    """
+    Reparte las lecturas entre réplicas en round-robin. Una réplica que falla
+    se expulsa durante `eject_seconds` y vuelve a intentarse al vencer el
+    plazo. El estado (turno y expulsiones) es del proceso, de modo que todos
+    los gestores con las mismas réplicas lo comparten.
+    """
+
+    _ejected = {}  # llave de réplica -> monotonic hasta el que está fuera
+    _turns = {}  # tupla de llaves -> siguiente índice
+    _lock = threading.Lock()
+
+    def __init__(self, replicas, eject_seconds=30):
+        # replicas: lista de (llave, engine)
+        self.replicas = list(replicas)
+        self.eject_seconds = eject_seconds
+        self._keys = tuple(key for key, _ in self.replicas)
+
+    def __len__(self):
+        return len(self.replicas)
+
+    def candidates(self):
+        """Réplicas disponibles en el orden en que deben intentarse."""
+        if not self.replicas:
+            return []
+        now = time.monotonic()
+        with ReadRouter._lock:
+            start = ReadRouter._turns.get(self._keys, 0)
+            ReadRouter._turns[self._keys] = (start + 1) % len(self.replicas)
+            ordered = self.replicas[start:] + self.replicas[:start]
+            return [(key, engine) for key, engine in ordered if ReadRouter._ejected.get(key, 0) <= now]
+
+    def eject(self, key, error=None):
+        with ReadRouter._lock:
+            ReadRouter._ejected[key] = time.monotonic() + self.eject_seconds
+        logger.warning(f"Réplica {key[0]}://{key[1] or ''}/{key[2]} fuera de servicio {self.eject_seconds}s: {error}")
+
+    @classmethod
+    def status(cls):
+        now = time.monotonic()
+        with cls._lock:
+            return {
+                f"{key[0]}://{key[1] or ''}/{key[2]}": round(until - now, 1)
+                for key, until in cls._ejected.items() if until > now
+            }
@@ -2,8 +2,11 @@ import sys, os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
 
-from BaseDBM import BaseDBManager
-from sqlalchemy import create_engine, text
+import time
+from functools import partial
+from .BaseDBM import BaseDBManager, _env_bool
+from sqlalchemy import create_engine, event, text, insert
+from sqlalchemy.engine import make_url
 from dotenv import load_dotenv
 from src import LoggerFactory
 
@@ -11,12 +14,125 @@ logger = LoggerFactory().get_logger("db", "db.log", consola=True)
 
 load_dotenv("../../.env")
 
+# Perfil de rendimiento (opt-in): lectores concurrentes con un escritor (WAL),
+# fsync sólo en checkpoints y caché/mmap amplios para las consultas del catálogo.
+PERFORMANCE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 268435456,  # 256 MB
+    "cache_size": -65536,  # En KiB: 64 MB
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,  # ms
+}
+
+# Cada cuánto (segundos) se corre `PRAGMA optimize` al cerrar un gestor
+OPTIMIZE_INTERVAL = 3600
+
+
+def _apply_pragmas(pragmas, read_only, dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma, value in pragmas.items():
+            # journal_mode/synchronous requieren escritura o no aplican a lectores
+            if read_only and pragma in ("journal_mode", "synchronous"):
+                continue
+            cursor.execute(f"PRAGMA {pragma}={value}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+    finally:
+        cursor.close()
+
+
 class SQLiteDBManager(BaseDBManager):
+    # Último `PRAGMA optimize` por archivo
+    _optimized_at = {}
+
     def __init__(self, file_path="db.sqlite", **kwargs):
         self.file_path = kwargs.get("file_path", file_path)
-        uri = f"sqlite:///{self.file_path}"
-        super().__init__(uri)
+        self.performance = _env_bool(kwargs.get("performance", os.getenv("dbSqlitePerformance", "false")))
+        self.read_only = _env_bool(kwargs.get("read_only", False))
+        self.pragmas = dict(PERFORMANCE_PRAGMAS) if self.performance else {}
+        self.pragmas.update(kwargs.get("pragmas") or {})
+        if self.read_only:
+            # URI de SQLite: el archivo debe existir y la conexión no puede escribir
+            uri = f"sqlite:///file:{self.file_path}?mode=ro&uri=true"
+        else:
+            uri = f"sqlite:///{self.file_path}"
+        super().__init__(uri, **kwargs)
+
+    @property
+    def _in_memory(self):
+        return self.file_path in ("", ":memory:")
+
+    def _pool_key(self):
+        # Cada modo (perfil/solo lectura) tiene su propio engine y eventos de conexión
+        mode = ("ro" if self.read_only else "rw",) + tuple(sorted(self.pragmas.items()))
+        return (make_url(self.database_uri).get_backend_name(), None, self.file_path, None, mode)
+
+    def _replica_uri(self, replica):
+        # Una réplica SQLite puede darse como ruta: se abre en solo lectura
+        replica = str(replica)
+        if "://" in replica:
+            return replica
+        return f"sqlite:///file:{replica}?mode=ro&uri=true"
+
+    def _engine_options(self):
+        # Una base en memoria vive en una sola conexión (SingletonThreadPool)
+        if self._in_memory:
+            return {}
+        return super()._engine_options()
+
+    def _configure_engine(self, engine, probe=True):
+        # Las réplicas se abren con mode=ro aunque el gestor no sea de solo lectura
+        read_only = self.read_only or engine.url.query.get("mode") == "ro"
+        if self.pragmas or read_only:
+            event.listen(engine, "connect", partial(_apply_pragmas, dict(self.pragmas), read_only))
+        return super()._configure_engine(engine, probe)
 
     def _check_or_create_database(self):
-        # SQLite crea la base al conectar si no existe
+        # SQLite crea la base al conectar si no existe; en solo lectura debe existir
+        if self.read_only and not os.path.exists(self.file_path):
+            logger.error(f"Base SQLite '{self.file_path}' no existe (modo solo lectura).")
+            return False
         return True
+
+    def optimize(self):
+        """Corre `PRAGMA optimize` para que SQLite actualice las estadísticas que lo requieran."""
+        if not self.engine:
+            self.connect()
+        with self.engine.connect() as conn:
+            conn.exec_driver_sql("PRAGMA optimize")
+            conn.commit()
+        with BaseDBManager._verified_lock:
+            SQLiteDBManager._optimized_at[self.file_path] = time.monotonic()
+        logger.info(f"PRAGMA optimize ejecutado en '{self.file_path}'.")
+
+    def close(self):
+        # Optimización periódica: como mucho una vez por OPTIMIZE_INTERVAL y por archivo
+        if self.engine and self.performance and not self.read_only and not self._in_memory:
+            last = SQLiteDBManager._optimized_at.get(self.file_path)
+            if last is None or time.monotonic() - last >= OPTIMIZE_INTERVAL:
+                try:
+                    self.optimize()
+                except Exception as e:
+                    logger.warning(f"No se pudo optimizar '{self.file_path}': {e}")
+        super().close()
+
+    def _bulk_load(self, table, chunks):
+        # Toda la carga en una transacción, sin fsync por commit mientras dura
+        total = 0
+        with self.engine.connect() as conn:
+            synchronous = conn.exec_driver_sql("PRAGMA synchronous").scalar()
+            conn.exec_driver_sql("PRAGMA synchronous=OFF")
+            conn.exec_driver_sql("PRAGMA temp_store=MEMORY")
+            conn.commit()
+            try:
+                with conn.begin():
+                    stmt = insert(table)
+                    for chunk in chunks:
+                        conn.execute(stmt, chunk)
+                        total += len(chunk)
+            finally:
+                conn.exec_driver_sql(f"PRAGMA synchronous={int(synchronous)}")
+                conn.commit()
+        return total
@@ -0,0 +1,104 @@
+import os, sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), ".")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+import threading
+import numpy as np
+from decimal import Decimal
+from src import LoggerFactory
+from .columnar import COMPROBANTES, ColumnarCFDI, firma_directorio
+
+logger = LoggerFactory().get_logger("sat", "sat.log", consola=True)
+
+IMPORTES = ("subtotal", "descuento", "iva_trasladado", "iva_retenido", "total")
+AGRUPACION = ("emisor_rfc", "tipo", "moneda", "metodo_pago")
+
+
+class AgregadorCFDI:
+    """
+    Totales mensuales por grupo calculados con NumPy sobre las particiones
+    columnares (importes en centavos int64). El resultado de cada mes se
+    memoriza y sólo se recalcula cuando cambia la huella de sus carpetas, es
+    decir, cuando llegan o se eliminan CFDIs de ese mes.
+    """
+
+    def __init__(self, columnar: ColumnarCFDI = None, base: str = "files"):
+        self.columnar = columnar or ColumnarCFDI(base=base)
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    def _firma_mes(self, rfc, anio, mes) -> tuple:
+        return tuple(
+            (t, firma_directorio(self.columnar.path_origen(rfc, anio, mes, t)))
+            for _, _, _, t in self.columnar.particiones(rfc, anio, mes)
+        )
+
+    def invalidar(self, rfc: str = None):
+        with self._lock:
+            if rfc is None:
+                self._memo.clear()
+            else:
+                for llave in [k for k in self._memo if k[0] == rfc]:
+                    del self._memo[llave]
+
+    def totales_mes(self, rfc: str, anio, mes, por=AGRUPACION) -> list:
+        """Totales del mes por grupo. Regresa una copia: el resultado memorizado no se expone."""
+        por = tuple(por)
+        invalidas = [c for c in por if COMPROBANTES.get(c) != "str"]
+        if invalidas:
+            raise ValueError(f"No se puede agrupar por: {', '.join(invalidas)}")
+
+        llave = (rfc, str(anio), str(mes), por)
+        firma = self._firma_mes(rfc, anio, mes)
+        with self._lock:
+            memo = self._memo.get(llave)
+        if memo and memo[0] == firma:
+            return [dict(fila) for fila in memo[1]]
+
+        # Las particiones desactualizadas se regeneran antes de agregar
+        self.columnar.exportar(rfc, anio, mes)
+        resultado = self._agregar(rfc, anio, mes, por)
+        with self._lock:
+            self._memo[llave] = (firma, resultado)
+        logger.info(f"Totales {rfc} {anio}/{mes} calculados: {len(resultado)} grupos.")
+        return [dict(fila) for fila in resultado]
+
+    def _agregar(self, rfc, anio, mes, por) -> list:
+        cadenas = {}  # Tabla de cadenas común a todas las particiones del mes
+        llaves, importes = [], {c: [] for c in IMPORTES}
+
+        for particion in self.columnar.particiones(rfc, anio, mes):
+            p = self.columnar.cargar(*particion)
+            if not len(p):
+                continue
+            # Traduce los códigos locales de la partición a la tabla común; el
+            # último elemento de `mapa` corresponde al código -1 (None).
+            mapa = np.array(
+                [cadenas.setdefault(v, len(cadenas)) for v in p.cadenas[:-1]] + [-1], dtype=np.int64
+            )
+            llaves.append(np.column_stack([mapa[p[c]] for c in por]))
+            for c in IMPORTES:
+                importes[c].append(np.asarray(p[c]))
+
+        if not llaves:
+            return []
+
+        grupos, inverso = np.unique(np.concatenate(llaves), axis=0, return_inverse=True)
+        inverso = inverso.ravel()
+        conteo = np.bincount(inverso, minlength=len(grupos))
+        sumas = {}
+        for c in IMPORTES:
+            suma = np.zeros(len(grupos), dtype=np.int64)
+            np.add.at(suma, inverso, np.concatenate(importes[c]))
+            sumas[c] = suma
+
+        valores = np.array(list(cadenas) + [None], dtype=object)
+        resultado = []
+        for i, grupo in enumerate(grupos):
+            fila = {c: valores[codigo] for c, codigo in zip(por, grupo)}
+            fila["comprobantes"] = int(conteo[i])
+            for c in IMPORTES:
+                fila[c] = Decimal(int(sumas[c][i])).scaleb(-2)
+            resultado.append(fila)
+        return resultado
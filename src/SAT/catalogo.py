@@ -0,0 +1,237 @@
+import os, sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), ".")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import and_, delete, or_, select
+from sqlalchemy.dialects.sqlite import insert
+from src import LoggerFactory, ModelRegistry, SQLiteDBManager
+from .cfdi import LectorCFDI, RutaCFDI
+
+logger = LoggerFactory().get_logger("sat", "sat.log", consola=True)
+
+NIVEL_EMISOR = 4  # RECIBIDOS/<año>/<mes>/<tipo>/<RFC emisor>
+
+
+class IndiceCFDI:
+    """
+    Catálogo persistente (SQLite) de files/<RFC>/RECIBIDOS. `actualizar` sólo
+    lista las carpetas cuyo mtime cambió y sólo parsea los archivos nuevos o con
+    size/mtime distinto; las consultas se resuelven con índices, sin recorrer disco.
+    """
+
+    def __init__(self, base: str = "files", db_path: str = None, carpeta: str = "RECIBIDOS",
+                 workers: int = None, lote: int = 1000):
+        self.base = base
+        self.carpeta = carpeta
+        self.workers = workers
+        self.lote = lote
+        self.Catalogo = ModelRegistry.modelo("CatalogoCFDI")
+        self.Directorio = ModelRegistry.modelo("DirectorioCFDI")
+        self.db = SQLiteDBManager(file_path=db_path or os.path.join(base, "catalogo.sqlite"), performance=True)
+        self.db.connect()
+        self.db.create_table(self.Catalogo)
+        self.db.create_table(self.Directorio)
+        # Catálogos creados antes de agregar un índice no lo tienen: create_table no los toca
+        for indice in self.Catalogo.__table__.indexes | self.Directorio.__table__.indexes:
+            indice.create(self.db.engine, checkfirst=True)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    # ---------------------------------------------------------------- rescan
+
+    def actualizar(self, rfc: str = None, completo: bool = False) -> dict:
+        """
+        Sincroniza el catálogo con el disco. Con `completo=True` se revisan
+        todas las carpetas aunque su mtime no haya cambiado (detecta archivos
+        modificados en sitio).
+        """
+        resumen = {"directorios": 0, "nuevos": 0, "eliminados": 0, "errores": 0}
+        session = self.db.Session()
+        try:
+            guardados = {d.path: d.mtime for d in session.query(self.Directorio)}
+            hijos = {}
+            for path, padre in session.query(self.Directorio.path, self.Directorio.padre):
+                hijos.setdefault(padre, []).append(path)
+
+            cambios_dir = []
+            pendientes = []
+            dirs_eliminados = []
+            archivos_eliminados = []
+
+            def visitar(path, padre, nivel):
+                try:
+                    mtime = os.stat(path).st_mtime_ns
+                except FileNotFoundError:
+                    return
+                resumen["directorios"] += 1
+                sin_cambios = guardados.get(path) == mtime and not completo
+                if not sin_cambios:
+                    cambios_dir.append({"path": path, "padre": padre, "nivel": nivel, "mtime": mtime})
+
+                if nivel == NIVEL_EMISOR:
+                    if not sin_cambios:
+                        self._comparar_archivos(session, path, pendientes, archivos_eliminados)
+                    return
+
+                if sin_cambios:
+                    actuales = hijos.get(path, [])
+                else:
+                    with os.scandir(path) as it:
+                        actuales = sorted(e.path for e in it if e.is_dir() and not e.name.startswith("."))
+                    dirs_eliminados.extend(set(hijos.get(path, [])) - set(actuales))
+                for hijo in actuales:
+                    visitar(hijo, path, nivel + 1)
+
+            for r in self._rfcs(rfc):
+                raiz = os.path.join(self.base, r, self.carpeta)
+                if os.path.isdir(raiz):
+                    visitar(raiz, None, 0)
+
+            resumen["eliminados"] = self._eliminar(session, dirs_eliminados, archivos_eliminados)
+            resumen["nuevos"], resumen["errores"] = self._catalogar(session, pendientes)
+            self._guardar(session, self.Directorio, cambios_dir, ["path"])
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error al actualizar el catálogo CFDI: {e}")
+            raise
+        finally:
+            session.close()
+
+        logger.info(
+            f"Catálogo CFDI actualizado: {resumen['directorios']} carpetas revisadas, "
+            f"{resumen['nuevos']} archivos catalogados, {resumen['eliminados']} eliminados."
+        )
+        return resumen
+
+    def _rfcs(self, rfc):
+        if rfc:
+            return [rfc]
+        with os.scandir(self.base) as it:
+            return sorted(e.name for e in it if e.is_dir() and not e.name.startswith("."))
+
+    def _comparar_archivos(self, session, directorio, pendientes, eliminados):
+        C = self.Catalogo
+        previos = {
+            path: (size, mtime)
+            for path, size, mtime in session.execute(
+                select(C.path, C.size, C.mtime).where(C.directorio == directorio)
+            )
+        }
+        partes = os.path.normpath(directorio).split(os.sep)
+        rfc, anio, mes, tipo, emisor = partes[-6], partes[-4], partes[-3], partes[-2], partes[-1]
+
+        with os.scandir(directorio) as it:
+            for e in it:
+                if not e.is_file() or not e.name.endswith(".xml"):
+                    continue
+                st = e.stat()
+                if previos.pop(e.path, None) != (st.st_size, st.st_mtime_ns):
+                    ruta = RutaCFDI(rfc, anio, mes, tipo, emisor, e.name[:-4].upper(), e.path)
+                    pendientes.append((ruta, directorio, st.st_size, st.st_mtime_ns))
+        # Lo que quedó en `previos` ya no existe en disco
+        eliminados.extend(previos)
+
+    def _eliminar(self, session, directorios, archivos) -> int:
+        C, D = self.Catalogo, self.Directorio
+        total = 0
+        for i in range(0, len(archivos), self.lote):
+            total += session.execute(delete(C).where(C.path.in_(archivos[i:i + self.lote]))).rowcount
+        for item in directorios:
+            total += session.execute(delete(C).where(self._bajo(C.directorio, item))).rowcount
+            session.execute(delete(D).where(self._bajo(D.path, item)))
+        return total
+
+    @staticmethod
+    def _bajo(columna, directorio):
+        # `directorio` y todo lo que cuelga de él. Rango [dir/, dir0) en lugar de
+        # LIKE: '_' y '%' del nombre no actúan como comodines y usa el índice.
+        inicio = directorio + os.sep
+        fin = directorio + chr(ord(os.sep) + 1)
+        return or_(columna == directorio, and_(columna >= inicio, columna < fin))
+
+    def _catalogar(self, session, pendientes):
+        if not pendientes:
+            return 0, 0
+        datos = {ruta.path: (directorio, size, mtime) for ruta, directorio, size, mtime in pendientes}
+        workers = self.workers or (1 if len(pendientes) < 500 else None)
+        lector = LectorCFDI(workers=workers, con_hash=True)
+
+        filas = []
+        total = 0
+        for doc in lector.procesar(ruta for ruta, *_ in pendientes):
+            directorio, size, mtime = datos[doc["path"]]
+            filas.append({
+                "uuid": doc["uuid"] or os.path.basename(doc["path"])[:-4].upper(),
+                "path": doc["path"],
+                "directorio": directorio,
+                "rfc": doc["rfc"],
+                "anio": int(doc["anio"]),
+                "mes": int(doc["mes"]),
+                "tipo": os.path.basename(os.path.dirname(directorio)),
+                "emisor_rfc": os.path.basename(directorio),
+                "fecha": datetime.fromisoformat(doc["fecha"]) if doc["fecha"] else None,
+                "total": Decimal(doc["total"]) if doc["total"] else None,
+                "moneda": doc["moneda"],
+                "size": size,
+                "mtime": mtime,
+                "hash": doc["hash"],
+            })
+            if len(filas) >= self.lote:
+                total += self._guardar(session, self.Catalogo, filas, ["uuid"])
+                filas = []
+        total += self._guardar(session, self.Catalogo, filas, ["uuid"])
+        return total, len(lector.errores)
+
+    @staticmethod
+    def _guardar(session, modelo, filas, llave) -> int:
+        if not filas:
+            return 0
+        stmt = insert(modelo)
+        columnas = {c.name: stmt.excluded[c.name] for c in modelo.__table__.columns if c.name not in llave}
+        session.execute(stmt.on_conflict_do_update(index_elements=llave, set_=columnas), filas)
+        return len(filas)
+
+    # ------------------------------------------------------------- consultas
+
+    def ubicar(self, uuid: str):
+        session = self.db.Session()
+        try:
+            return session.scalar(select(self.Catalogo.path).where(self.Catalogo.uuid == uuid.upper()))
+        finally:
+            session.close()
+
+    def buscar(self, rfc: str = None, emisor: str = None, anio=None, mes=None, tipo: str = None) -> list:
+        C = self.Catalogo
+        filtros = []
+        if rfc:
+            filtros.append(C.rfc == rfc)
+        if emisor:
+            filtros.append(C.emisor_rfc == emisor)
+        if anio is not None:
+            filtros.append(C.anio == int(anio))
+        if mes is not None:
+            filtros.append(C.mes == int(mes))
+        if tipo:
+            filtros.append(C.tipo == tipo)
+
+        session = self.db.Session()
+        try:
+            return session.scalars(select(C).where(*filtros).order_by(C.path)).all()
+        finally:
+            session.close()
+
+    def rutas(self, **filtros):
+        """Mismo contrato que `recorrer_cfdi`, pero resuelto desde el catálogo."""
+        for c in self.buscar(**filtros):
+            yield RutaCFDI(c.rfc, str(c.anio), str(c.mes), c.tipo, c.emisor_rfc, c.uuid, c.path)
@@ -3,23 +3,105 @@ import re
 import json
 import base64
 import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from cryptography import x509
 from cryptography.x509.oid import NameOID
-from cryptography.exceptions import InvalidSignature
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives.asymmetric import padding, utils
 from cryptography.hazmat.primitives.serialization import load_der_private_key
 
+BLOQUE_HASH = 1 << 20  # Lectura de archivos por bloques de 1 MB al calcular SHA-256
+
+
+def sha256_archivo(path: str) -> bytes:
+    """SHA-256 de un archivo leído por bloques: memoria constante sin importar su tamaño."""
+    h = hashlib.sha256()
+    buffer = bytearray(BLOQUE_HASH)
+    vista = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            h.update(vista[:n])
+    return h.digest()
+
+
+MANIFIESTO = "manifiesto.firma.json"  # Nombre del manifiesto dentro de la carpeta del periodo
+
+
+def _archivos_carpeta(carpeta: str) -> list:
+    """Rutas relativas (con '/') de todos los archivos bajo `carpeta`, ordenadas; omite firmas y el manifiesto."""
+    rutas = []
+    for raiz, dirs, archivos in os.walk(carpeta):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for nombre in archivos:
+            if nombre.startswith(".") or nombre == MANIFIESTO or nombre.endswith(".firma.json"):
+                continue
+            rutas.append(os.path.relpath(os.path.join(raiz, nombre), carpeta).replace(os.sep, "/"))
+    rutas.sort()
+    return rutas
+
+
+def _hashes_carpeta(carpeta: str, rutas, max_workers: int = None) -> dict:
+    # hashlib libera el GIL al digerir bloques grandes y la lectura es E/S: los hilos bastan
+    paths = [os.path.join(carpeta, *r.split("/")) for r in rutas]
+    if len(paths) < 2 or max_workers == 1:
+        digests = map(sha256_archivo, paths)
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            digests = list(executor.map(sha256_archivo, paths))
+    return {r: d.hex() for r, d in zip(rutas, digests)}
+
+
+def raiz_merkle(archivos: dict) -> str:
+    """
+    Raíz de Merkle sobre las entradas ruta -> SHA-256 en orden de ruta. Hoja:
+    SHA-256(0x00 || ruta || 0x00 || hash); nodo: SHA-256(0x01 || izq || der);
+    un nodo sin pareja sube tal cual al siguiente nivel.
+    """
+    nivel = [
+        hashlib.sha256(b"\x00" + ruta.encode("utf-8") + b"\x00" + bytes.fromhex(archivos[ruta])).digest()
+        for ruta in sorted(archivos)
+    ]
+    if not nivel:
+        return hashlib.sha256(b"").hexdigest()
+    while len(nivel) > 1:
+        siguiente = [hashlib.sha256(b"\x01" + nivel[i] + nivel[i + 1]).digest() for i in range(0, len(nivel) - 1, 2)]
+        if len(nivel) % 2:
+            siguiente.append(nivel[-1])
+        nivel = siguiente
+    return nivel[0].hex()
+
+
+def _canonico(manifiesto: dict) -> bytes:
+    # Lo que se firma: el manifiesto sin la firma, con llaves ordenadas y sin espacios
+    datos = {k: v for k, v in manifiesto.items() if k != "firma"}
+    return json.dumps(datos, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
 class CertSAT:
-    def __init__(self, path_cer: str, path_key: str = None, path_pwd: str = None):
+    def __init__(self, path_cer: str, path_key: str = None, path_pwd: str = None, pwd: str = None):
         self.path_cer = path_cer
         self.path_key = path_key
         self.path_pwd = path_pwd
         self._cer_bytes = None
         self._key_bytes = None
-        self._pwd = None
+        self._pwd = pwd  # Contraseña directa (p. ej. de la tabla certificados) en lugar de `path_pwd`
         self._info = None
+        # Certificado y llave privada (descifrada) se cargan una sola vez por instancia
+        self._cert = None
+        self._private_key = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def desde_der(cls, cer_bytes: bytes) -> "CertSAT":
+        """CertSAT sólo con certificado (p. ej. el atributo Certificado de un CFDI), para validar firmas."""
+        cert = cls(None)
+        cert._cer_bytes = bytes(cer_bytes)
+        return cert
 
     def __iter__(self):
         return iter(self.info.items())
@@ -34,8 +116,9 @@ class CertSAT:
     @property
     def key_bytes(self) -> bytes:
         if self.path_key and self._key_bytes is None:
+            # bytearray para poder sobrescribirla en `close`
             with open(self.path_key, "rb") as f:
-                self._key_bytes = f.read()
+                self._key_bytes = bytearray(f.read())
         return self._key_bytes
 
     @property
@@ -45,21 +128,56 @@ class CertSAT:
                 self._pwd = f.readline().strip()
         return self._pwd
 
+    @property
+    def cert(self) -> x509.Certificate:
+        if self._cert is None:
+            self._cert = x509.load_der_x509_certificate(self.cer_bytes, default_backend())
+        return self._cert
+
+    @property
+    def private_key(self):
+        if not self.path_key or self.pwd is None:
+            raise ValueError("Para firmar se requiere la llave y la contraseña.")
+        if self._private_key is None:
+            with self._lock:
+                if self._private_key is None:
+                    try:
+                        self._private_key = load_der_private_key(
+                            bytes(self.key_bytes), password=self.pwd.encode(), backend=default_backend()
+                        )
+                    except Exception as e:
+                        raise ValueError(f"No se pudo cargar la llave privada: {e}")
+        return self._private_key
+
+    @property
+    def no_certificado(self) -> str:
+        """Número de certificado como lo escribe el SAT: los bytes del número de serie en ASCII."""
+        serie = self.cert.serial_number
+        return serie.to_bytes((serie.bit_length() + 7) // 8, "big").decode("ascii", errors="replace")
+
     def validar_correspondencia(self, cert: x509.Certificate):
-        if not self.path_key or not self.path_pwd:
+        if not self.path_key or self.pwd is None:
             return
-        try:
-            private_key = load_der_private_key(self.key_bytes, password=self.pwd.encode(), backend=default_backend())
-        except Exception as e:
-            raise ValueError(f"No se pudo cargar la llave privada: {e}")
-
-        mensaje = b"test-firma"
-        firma = private_key.sign(mensaje, padding.PKCS1v15(), hashes.SHA256())
-        try:
-            cert.public_key().verify(firma, mensaje, padding.PKCS1v15(), hashes.SHA256())
-        except InvalidSignature:
+        # Misma llave pública (módulo y exponente): no hace falta firmar un mensaje de prueba
+        if self.private_key.public_key().public_numbers() != cert.public_key().public_numbers():
             raise ValueError("La llave privada no corresponde al certificado.")
 
+    def close(self):
+        """Sobrescribe la llave leída y suelta la llave descifrada y la contraseña."""
+        with self._lock:
+            if isinstance(self._key_bytes, bytearray):
+                self._key_bytes[:] = bytes(len(self._key_bytes))
+            self._key_bytes = None
+            self._private_key = None
+            self._pwd = None
+            self._info = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
     @property
     def info(self) -> dict:
         if self._info is not None:
@@ -68,7 +186,7 @@ class CertSAT:
         if not os.path.exists(self.path_cer):
             raise FileNotFoundError(f"El archivo '{self.path_cer}' no existe.")
 
-        cert = x509.load_der_x509_certificate(self.cer_bytes, default_backend())
+        cert = self.cert
         self.validar_correspondencia(cert)
 
         subject = cert.subject
@@ -105,17 +223,38 @@ class CertSAT:
         return self._info
 
     def firmar(self, mensaje: bytes) -> str:
-        if not self.path_key or not self.path_pwd:
-            raise ValueError("Para firmar se requiere la llave y la contraseña.")
-        private_key = load_der_private_key(self.key_bytes, password=self.pwd.encode(), backend=default_backend())
-        firma = private_key.sign(mensaje, padding.PKCS1v15(), hashes.SHA256())
+        firma = self.private_key.sign(mensaje, padding.PKCS1v15(), hashes.SHA256())
         return base64.b64encode(firma).decode("utf-8")
 
+    def firmar_lote(self, mensajes, max_workers: int = None) -> list:
+        """
+        Firma muchos mensajes en un pool de hilos (OpenSSL libera el GIL al
+        firmar). Regresa las firmas en base64 en el mismo orden.
+        """
+        mensajes = list(mensajes)
+        self.private_key  # Descifra la llave una vez, antes de repartir el trabajo
+        if len(mensajes) < 2 or max_workers == 1:
+            return [self.firmar(m) for m in mensajes]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(self.firmar, mensajes))
+
+    def firmar_digest(self, digest: bytes) -> str:
+        """Firma un SHA-256 ya calculado; equivale a `firmar` sobre el contenido original."""
+        firma = self.private_key.sign(digest, padding.PKCS1v15(), utils.Prehashed(hashes.SHA256()))
+        return base64.b64encode(firma).decode("utf-8")
+
+    def validar_firma_digest(self, digest: bytes, firma_b64: str) -> bool:
+        try:
+            firma = base64.b64decode(firma_b64)
+            self.cert.public_key().verify(firma, digest, padding.PKCS1v15(), utils.Prehashed(hashes.SHA256()))
+            return True
+        except Exception:
+            return False
+
     def validar_firma(self, mensaje: bytes, firma_b64: str) -> bool:
-        cert = x509.load_der_x509_certificate(self.cer_bytes, default_backend())
         try:
             firma = base64.b64decode(firma_b64)
-            cert.public_key().verify(firma, mensaje, padding.PKCS1v15(), hashes.SHA256())
+            self.cert.public_key().verify(firma, mensaje, padding.PKCS1v15(), hashes.SHA256())
             return True
         except Exception:
             return False
@@ -124,15 +263,12 @@ class CertSAT:
         if not os.path.exists(path):
             raise FileNotFoundError(f"El archivo '{path}' no existe.")
 
-        with open(path, "rb") as f:
-            contenido = f.read()
-        firma_b64 = self.firmar(contenido)
-        sha256_hash = hashlib.sha256(contenido).hexdigest()
-
+        # Una sola pasada sobre el archivo: el mismo SHA-256 se firma y se reporta
+        digest = sha256_archivo(path)
         return {
             "archivo": os.path.basename(path),
-            "firma": firma_b64,
-            "hash": sha256_hash
+            "firma": self.firmar_digest(digest),
+            "hash": digest.hex()
         }
 
     def firmar_archivo_con_guardado(self, path: str, destino: str = None) -> dict:
@@ -146,9 +282,7 @@ class CertSAT:
     def verificar_firma_archivo(self, path: str, firma_b64: str) -> bool:
         if not os.path.exists(path):
             raise FileNotFoundError(f"El archivo '{path}' no existe.")
-        with open(path, "rb") as f:
-            contenido = f.read()
-        return self.validar_firma(contenido, firma_b64)
+        return self.validar_firma_digest(sha256_archivo(path), firma_b64)
 
     def verificar_firma_desde_json(self, path_archivo: str, path_json: str) -> dict:
         resultado = {
@@ -166,8 +300,7 @@ class CertSAT:
             return resultado
 
         try:
-            with open(path_archivo, "rb") as f:
-                contenido = f.read()
+            digest = sha256_archivo(path_archivo)
             with open(path_json, "r", encoding="utf-8") as f:
                 datos = json.load(f)
         except Exception as e:
@@ -175,8 +308,8 @@ class CertSAT:
             return resultado
 
         resultado["archivo_valido"] = os.path.basename(path_archivo) == datos.get("archivo")
-        resultado["hash_valido"] = hashlib.sha256(contenido).hexdigest() == datos.get("hash")
-        resultado["firma_valida"] = self.validar_firma(contenido, datos.get("firma"))
+        resultado["hash_valido"] = digest.hex() == datos.get("hash")
+        resultado["firma_valida"] = self.validar_firma_digest(digest, datos.get("firma"))
 
         if all([resultado["archivo_valido"], resultado["hash_valido"], resultado["firma_valida"]]):
             resultado["detalle"] = "Verificación completa exitosa."
@@ -192,6 +325,97 @@ class CertSAT:
 
         return resultado
 
+    def firmar_manifiesto(self, carpeta: str, destino: str = None, merkle: bool = False,
+                          max_workers: int = None) -> dict:
+        """
+        Firma un periodo completo (p. ej. files/<RFC>/RECIBIDOS/2020/1) con una
+        sola firma: calcula en paralelo el SHA-256 de cada archivo, arma el
+        manifiesto ruta -> hash (y opcionalmente su raíz de Merkle) y firma su
+        forma canónica. Se guarda en `destino` o en <carpeta>/manifiesto.firma.json.
+        """
+        if not os.path.isdir(carpeta):
+            raise FileNotFoundError(f"La carpeta '{carpeta}' no existe.")
+
+        archivos = _hashes_carpeta(carpeta, _archivos_carpeta(carpeta), max_workers)
+        manifiesto = {
+            "carpeta": os.path.basename(os.path.normpath(carpeta)),
+            "algoritmo": "sha256",
+            "certificado": str(self.cert.serial_number),
+            "total": len(archivos),
+            "archivos": archivos,
+        }
+        if merkle:
+            manifiesto["merkle"] = raiz_merkle(archivos)
+        manifiesto["firma"] = self.firmar(_canonico(manifiesto))
+
+        if destino is None:
+            destino = os.path.join(carpeta, MANIFIESTO)
+        with open(destino, "w", encoding="utf-8") as f:
+            json.dump(manifiesto, f, indent=1, ensure_ascii=False)
+        return manifiesto
+
+    def verificar_manifiesto(self, carpeta: str, path_manifiesto: str = None, archivo: str = None,
+                             max_workers: int = None) -> dict:
+        """
+        Verifica la firma del manifiesto una sola vez y después el periodo
+        completo (archivos alterados, faltantes y nuevos) o, si se da `archivo`
+        (ruta relativa a `carpeta` o absoluta), sólo ese archivo.
+        """
+        resultado = {
+            "firma_valida": False,
+            "merkle_valido": None,
+            "alterados": [],
+            "faltantes": [],
+            "nuevos": [],
+            "detalle": ""
+        }
+        if path_manifiesto is None:
+            path_manifiesto = os.path.join(carpeta, MANIFIESTO)
+        if not os.path.exists(path_manifiesto):
+            resultado["detalle"] = f"Manifiesto no encontrado: {path_manifiesto}"
+            return resultado
+
+        try:
+            with open(path_manifiesto, "r", encoding="utf-8") as f:
+                manifiesto = json.load(f)
+            esperados = manifiesto["archivos"]
+        except Exception as e:
+            resultado["detalle"] = f"Error al leer el manifiesto: {e}"
+            return resultado
+
+        resultado["firma_valida"] = self.validar_firma(_canonico(manifiesto), manifiesto.get("firma"))
+        if not resultado["firma_valida"]:
+            resultado["detalle"] = "Fallo en: firma digital del manifiesto"
+            return resultado
+        if "merkle" in manifiesto:
+            resultado["merkle_valido"] = raiz_merkle(esperados) == manifiesto["merkle"]
+
+        if archivo is not None:
+            ruta = os.path.relpath(archivo, carpeta) if os.path.isabs(archivo) else archivo
+            ruta = ruta.replace(os.sep, "/")
+            if ruta not in esperados:
+                resultado["nuevos"].append(ruta)
+            elif not os.path.exists(os.path.join(carpeta, ruta)):
+                resultado["faltantes"].append(ruta)
+            elif sha256_archivo(os.path.join(carpeta, ruta)).hex() != esperados[ruta]:
+                resultado["alterados"].append(ruta)
+        else:
+            presentes = _archivos_carpeta(carpeta)
+            conocidos = [r for r in presentes if r in esperados]
+            actuales = _hashes_carpeta(carpeta, conocidos, max_workers)
+            resultado["alterados"] = [r for r in conocidos if actuales[r] != esperados[r]]
+            resultado["faltantes"] = sorted(set(esperados) - set(presentes))
+            resultado["nuevos"] = [r for r in presentes if r not in esperados]
+
+        errores = []
+        if resultado["merkle_valido"] is False:
+            errores.append("raíz de Merkle")
+        for clave in ("alterados", "faltantes", "nuevos"):
+            if resultado[clave]:
+                errores.append(f"{len(resultado[clave])} {clave}")
+        resultado["detalle"] = f"Fallo en: {', '.join(errores)}" if errores else "Verificación completa exitosa."
+        return resultado
+
 
 
 # Ejemplo de uso
@@ -0,0 +1,238 @@
+import os, sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), ".")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+import hashlib
+from io import BytesIO
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from functools import partial
+from lxml import etree
+from src import LoggerFactory
+
+logger = LoggerFactory().get_logger("sat", "sat.log", consola=True)
+
+NS_CFDI = {
+    "3": "http://www.sat.gob.mx/cfd/3",
+    "4": "http://www.sat.gob.mx/cfd/4",
+}
+NS_TFD = "http://www.sat.gob.mx/TimbreFiscalDigital"
+IVA = "002"
+
+# Ubicación de un CFDI dentro de files/<RFC>/RECIBIDOS/<año>/<mes>/<E|I|P>/<RFC emisor>/<UUID>.xml
+RutaCFDI = namedtuple("RutaCFDI", "rfc anio mes tipo emisor uuid path")
+
+
+def _compilar(ns_cfdi: str) -> dict:
+    ns = {"cfdi": ns_cfdi, "tfd": NS_TFD}
+    return {
+        "emisor": etree.XPath("cfdi:Emisor", namespaces=ns),
+        "receptor": etree.XPath("cfdi:Receptor", namespaces=ns),
+        "iva_trasladado": etree.XPath(
+            "cfdi:Impuestos/cfdi:Traslados/cfdi:Traslado[@Impuesto=$imp]/@Importe", namespaces=ns
+        ),
+        "iva_retenido": etree.XPath(
+            "cfdi:Impuestos/cfdi:Retenciones/cfdi:Retencion[@Impuesto=$imp]/@Importe", namespaces=ns
+        ),
+        "timbre": etree.XPath("cfdi:Complemento/tfd:TimbreFiscalDigital", namespaces=ns),
+    }
+
+
+# XPath precompiladas por namespace de Comprobante (CFDI 3.3 y 4.0)
+_XPATHS = {f"{{{ns}}}Comprobante": _compilar(ns) for ns in NS_CFDI.values()}
+_CONCEPTOS = tuple(f"{{{ns}}}Concepto" for ns in NS_CFDI.values())
+_COMPROBANTES = tuple(_XPATHS)
+
+
+def _sumar(importes) -> str:
+    return str(sum((Decimal(i) for i in importes), Decimal("0")))
+
+
+def _concepto(elem) -> dict:
+    a = elem.attrib
+    return {
+        "clave_prod_serv": a.get("ClaveProdServ"),
+        "no_identificacion": a.get("NoIdentificacion"),
+        "cantidad": a.get("Cantidad"),
+        "clave_unidad": a.get("ClaveUnidad"),
+        "unidad": a.get("Unidad"),
+        "descripcion": a.get("Descripcion"),
+        "valor_unitario": a.get("ValorUnitario"),
+        "importe": a.get("Importe"),
+        "descuento": a.get("Descuento", "0"),
+    }
+
+
+def _parsear(fuente, path, digest=None) -> dict:
+    conceptos = []
+    for _, elem in etree.iterparse(fuente, events=("end",), tag=_CONCEPTOS + _COMPROBANTES):
+        if elem.tag in _CONCEPTOS:
+            conceptos.append(_concepto(elem))
+            elem.clear(keep_tail=True)
+            continue
+
+        xp = _XPATHS[elem.tag]
+        a = elem.attrib
+        emisor = xp["emisor"](elem)
+        receptor = xp["receptor"](elem)
+        timbre = xp["timbre"](elem)
+        emisor = emisor[0].attrib if emisor else {}
+        receptor = receptor[0].attrib if receptor else {}
+        timbre = timbre[0].attrib if timbre else {}
+
+        doc = {
+            "uuid": (timbre.get("UUID") or "").upper() or None,
+            "version": a.get("Version"),
+            "serie": a.get("Serie"),
+            "folio": a.get("Folio"),
+            "fecha": a.get("Fecha"),
+            "fecha_timbrado": timbre.get("FechaTimbrado"),
+            "tipo": a.get("TipoDeComprobante"),
+            "subtotal": a.get("SubTotal"),
+            "descuento": a.get("Descuento", "0"),
+            "total": a.get("Total"),
+            "moneda": a.get("Moneda"),
+            "tipo_cambio": a.get("TipoCambio", "1"),
+            "metodo_pago": a.get("MetodoPago"),
+            "forma_pago": a.get("FormaPago"),
+            "no_certificado": a.get("NoCertificado"),
+            "emisor_rfc": emisor.get("Rfc"),
+            "emisor_nombre": emisor.get("Nombre"),
+            "receptor_rfc": receptor.get("Rfc"),
+            "receptor_nombre": receptor.get("Nombre"),
+            "iva_trasladado": _sumar(xp["iva_trasladado"](elem, imp=IVA)),
+            "iva_retenido": _sumar(xp["iva_retenido"](elem, imp=IVA)),
+            "conceptos": conceptos,
+            "path": str(path),
+        }
+        if digest:
+            doc["hash"] = digest
+        elem.clear()
+        return doc
+
+    raise ValueError(f"El archivo '{path}' no contiene un cfdi:Comprobante.")
+
+
+def leer_cfdi(path: str, con_hash: bool = False) -> dict:
+    """
+    Lee un CFDI con iterparse: los Conceptos se extraen y liberan conforme se
+    cierran y el resto del comprobante se resuelve con XPath precompiladas.
+    Los importes se conservan como texto, tal como vienen en el XML.
+    Con `con_hash` el archivo se lee una sola vez para parsearlo y obtener su SHA256.
+    """
+    if con_hash:
+        with open(path, "rb") as f:
+            contenido = f.read()
+        return _parsear(BytesIO(contenido), path, hashlib.sha256(contenido).hexdigest())
+    # iterparse sobre una ruta abre el archivo por su cuenta y, al regresar
+    # desde el ciclo, no lo cierra explícitamente: se abre aquí
+    with open(path, "rb") as f:
+        return _parsear(f, path)
+
+
+def recorrer_cfdi(base: str = "files", rfc: str = None, anio=None, mes=None, tipo: str = None,
+                  emisor: str = None, carpeta: str = "RECIBIDOS"):
+    """
+    Generador sobre files/<RFC>/<carpeta>/<año>/<mes>/<tipo>/<RFC emisor>/<UUID>.xml.
+    Cada filtro omitido recorre todos los valores de ese nivel.
+    """
+    def _subdirs(path, valor=None):
+        if valor is not None:
+            destino = os.path.join(path, str(valor))
+            if os.path.isdir(destino):
+                yield str(valor), destino
+            return
+        try:
+            with os.scandir(path) as it:
+                entradas = sorted((e.name, e.path) for e in it if e.is_dir() and not e.name.startswith("."))
+        except FileNotFoundError:
+            return
+        yield from entradas
+
+    for r, path_rfc in _subdirs(base, rfc):
+        raiz = os.path.join(path_rfc, carpeta)
+        for a, path_anio in _subdirs(raiz, anio):
+            for m, path_mes in _subdirs(path_anio, mes):
+                for t, path_tipo in _subdirs(path_mes, tipo):
+                    for e, path_emisor in _subdirs(path_tipo, emisor):
+                        with os.scandir(path_emisor) as it:
+                            archivos = sorted(x.name for x in it if x.is_file() and x.name.endswith(".xml"))
+                        for nombre in archivos:
+                            yield RutaCFDI(r, a, m, t, e, nombre[:-4].upper(),
+                                           os.path.join(path_emisor, nombre))
+
+
+def _leer_lote(rutas, con_hash=False):
+    resultados = []
+    for ruta in rutas:
+        path = ruta.path if isinstance(ruta, RutaCFDI) else ruta
+        try:
+            doc = leer_cfdi(path, con_hash)
+            if isinstance(ruta, RutaCFDI):
+                doc.update(rfc=ruta.rfc, anio=ruta.anio, mes=ruta.mes)
+            resultados.append(doc)
+        except Exception as e:
+            resultados.append({"path": str(path), "error": str(e)})
+    return resultados
+
+
+class LectorCFDI:
+    """
+    Lectura paralela de CFDIs. Las rutas se envían a un pool de procesos en
+    lotes y sólo se mantienen en vuelo `max_pendientes` lotes a la vez, por lo
+    que la memoria no crece con el tamaño del archivo histórico.
+    """
+
+    def __init__(self, workers: int = None, lote: int = 256, max_pendientes: int = None,
+                 con_hash: bool = False):
+        self.workers = workers or os.cpu_count() or 1
+        self.lote = lote
+        self.max_pendientes = max_pendientes or self.workers * 2
+        self.con_hash = con_hash
+        self.errores = []
+
+    def _lotes(self, rutas):
+        lote = []
+        for ruta in rutas:
+            lote.append(ruta)
+            if len(lote) >= self.lote:
+                yield lote
+                lote = []
+        if lote:
+            yield lote
+
+    def _trabajo(self):
+        # Función que procesa un lote en el worker; debe poder enviarse al pool (picklable)
+        return partial(_leer_lote, con_hash=self.con_hash)
+
+    def _entregar(self, resultados):
+        for doc in resultados:
+            if "error" in doc:
+                logger.warning(f"No se pudo leer CFDI '{doc['path']}': {doc['error']}")
+                self.errores.append((doc["path"], doc["error"]))
+                continue
+            yield doc
+
+    def procesar(self, rutas):
+        """Genera los CFDIs leídos, en el mismo orden que `rutas`."""
+        self.errores = []
+        trabajo = self._trabajo()
+        if self.workers <= 1:
+            for lote in self._lotes(rutas):
+                yield from self._entregar(trabajo(lote))
+            return
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            pendientes = deque()
+            for lote in self._lotes(rutas):
+                pendientes.append(pool.submit(trabajo, lote))
+                if len(pendientes) >= self.max_pendientes:
+                    yield from self._entregar(pendientes.popleft().result())
+            while pendientes:
+                yield from self._entregar(pendientes.popleft().result())
+
+    def leer(self, base: str = "files", rfc: str = None, anio=None, mes=None, tipo: str = None,
+             emisor: str = None):
+        return self.procesar(recorrer_cfdi(base, rfc, anio, mes, tipo, emisor))
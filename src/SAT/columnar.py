@@ -0,0 +1,302 @@
+import os, sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), ".")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+import json
+import hashlib
+import numpy as np
+from decimal import Decimal, ROUND_HALF_UP
+from src import LoggerFactory
+from .cfdi import LectorCFDI, recorrer_cfdi
+
+logger = LoggerFactory().get_logger("sat", "sat.log", consola=True)
+
+CENTAVO = Decimal("0.01")
+
+# Tipo lógico de cada columna: "str" se codifica contra la tabla de cadenas de
+# la partición, "centavos" es int64 en punto fijo y "fecha" es datetime64[s].
+COMPROBANTES = {
+    "uuid": "str",
+    "serie": "str",
+    "folio": "str",
+    "fecha": "fecha",
+    "tipo": "str",
+    "moneda": "str",
+    "tipo_cambio": "float",
+    "metodo_pago": "str",
+    "forma_pago": "str",
+    "emisor_rfc": "str",
+    "emisor_nombre": "str",
+    "receptor_rfc": "str",
+    "subtotal": "centavos",
+    "descuento": "centavos",
+    "iva_trasladado": "centavos",
+    "iva_retenido": "centavos",
+    "total": "centavos",
+}
+
+CONCEPTOS = {
+    "comprobante": "int",  # Renglón en `comprobantes` de la misma partición
+    "clave_prod_serv": "str",
+    "no_identificacion": "str",
+    "clave_unidad": "str",
+    "descripcion": "str",
+    "cantidad": "float",
+    "valor_unitario": "centavos",
+    "importe": "centavos",
+    "descuento": "centavos",
+}
+
+TABLAS = {"comprobantes": COMPROBANTES, "conceptos": CONCEPTOS}
+
+
+def a_centavos(valor) -> int:
+    if valor in (None, ""):
+        return 0
+    return int(Decimal(valor).quantize(CENTAVO, rounding=ROUND_HALF_UP) * 100)
+
+
+def firma_directorio(path: str) -> str:
+    """
+    Huella de una carpeta <tipo> basada sólo en mtimes: cambia cuando llega o
+    se elimina un CFDI (cambia el mtime de la carpeta del emisor) o un emisor.
+    """
+    h = hashlib.sha256()
+    try:
+        h.update(str(os.stat(path).st_mtime_ns).encode())
+        with os.scandir(path) as it:
+            for e in sorted(it, key=lambda x: x.name):
+                if e.is_dir():
+                    h.update(f"{e.name}:{e.stat().st_mtime_ns};".encode())
+    except FileNotFoundError:
+        return ""
+    return h.hexdigest()
+
+
+class _Cadenas:
+    def __init__(self):
+        self.valores = []
+        self._indice = {}
+
+    def codigo(self, valor) -> int:
+        if valor is None:
+            return -1
+        codigo = self._indice.get(valor)
+        if codigo is None:
+            codigo = self._indice[valor] = len(self.valores)
+            self.valores.append(valor)
+        return codigo
+
+
+class Particion:
+    """Columnas de una partición <RFC>/<año>/<mes>/<tipo> cargadas (por defecto con mmap)."""
+
+    def __init__(self, path: str, columnas: dict, cadenas: list, meta: dict):
+        self.path = path
+        self.columnas = columnas
+        self.cadenas = np.array(cadenas + [None], dtype=object)  # El código -1 apunta a None
+        self.meta = meta
+
+    def __getitem__(self, columna):
+        return self.columnas[columna]
+
+    def __len__(self):
+        return len(next(iter(self.columnas.values()), ()))
+
+    def texto(self, columna):
+        return self.cadenas[self.columnas[columna]]
+
+
+class ColumnarCFDI:
+    """
+    Exporta el árbol files/<RFC>/RECIBIDOS a files/<RFC>/COLUMNAR/<año>/<mes>/<tipo>/
+    como columnas NumPy (.npy, memory-mappable) con una tabla de cadenas por
+    partición, o como Parquet si se pide `formato="parquet"` y pyarrow está instalado.
+    """
+
+    def __init__(self, base: str = "files", carpeta: str = "RECIBIDOS", destino: str = "COLUMNAR",
+                 formato: str = "npy", workers: int = None):
+        if formato not in ("npy", "parquet"):
+            raise ValueError("El formato debe ser 'npy' o 'parquet'.")
+        self.base = base
+        self.carpeta = carpeta
+        self.destino = destino
+        self.formato = formato
+        self.workers = workers
+
+    def path_origen(self, rfc, anio, mes, tipo) -> str:
+        return os.path.join(self.base, rfc, self.carpeta, str(anio), str(mes), tipo)
+
+    def path_particion(self, rfc, anio, mes, tipo) -> str:
+        return os.path.join(self.base, rfc, self.destino, str(anio), str(mes), tipo)
+
+    def particiones(self, rfc: str, anio=None, mes=None, tipo: str = None):
+        """Genera (rfc, año, mes, tipo) de las carpetas de origen que cumplen los filtros."""
+        def _subdirs(path, valor):
+            if valor is not None:
+                return [str(valor)] if os.path.isdir(os.path.join(path, str(valor))) else []
+            try:
+                with os.scandir(path) as it:
+                    return sorted(e.name for e in it if e.is_dir() and not e.name.startswith("."))
+            except FileNotFoundError:
+                return []
+
+        raiz = os.path.join(self.base, rfc, self.carpeta)
+        for a in _subdirs(raiz, anio):
+            for m in _subdirs(os.path.join(raiz, a), mes):
+                for t in _subdirs(os.path.join(raiz, a, m), tipo):
+                    yield rfc, a, m, t
+
+    def meta(self, rfc, anio, mes, tipo) -> dict:
+        path = os.path.join(self.path_particion(rfc, anio, mes, tipo), "meta.json")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def vigente(self, rfc, anio, mes, tipo) -> bool:
+        meta = self.meta(rfc, anio, mes, tipo)
+        return bool(meta) and meta.get("firma") == firma_directorio(self.path_origen(rfc, anio, mes, tipo))
+
+    # ---------------------------------------------------------------- export
+
+    def exportar(self, rfc: str, anio=None, mes=None, tipo: str = None, forzar: bool = False) -> list:
+        """Exporta las particiones que cambiaron desde la última exportación."""
+        exportadas = []
+        for particion in self.particiones(rfc, anio, mes, tipo):
+            if not forzar and self.vigente(*particion):
+                continue
+            self.exportar_particion(*particion)
+            exportadas.append(particion)
+        return exportadas
+
+    def exportar_particion(self, rfc, anio, mes, tipo) -> dict:
+        firma = firma_directorio(self.path_origen(rfc, anio, mes, tipo))
+        cadenas = _Cadenas()
+        datos = {tabla: {col: [] for col in columnas} for tabla, columnas in TABLAS.items()}
+
+        lector = LectorCFDI(workers=self.workers)
+        for i, doc in enumerate(lector.procesar(recorrer_cfdi(self.base, rfc, anio, mes, tipo, carpeta=self.carpeta))):
+            self._agregar(datos["comprobantes"], COMPROBANTES, doc, cadenas)
+            for concepto in doc["conceptos"]:
+                self._agregar(datos["conceptos"], CONCEPTOS, dict(concepto, comprobante=i), cadenas)
+
+        arreglos = {
+            tabla: {col: self._arreglo(datos[tabla][col], tipo_col) for col, tipo_col in columnas.items()}
+            for tabla, columnas in TABLAS.items()
+        }
+        destino = self.path_particion(rfc, anio, mes, tipo)
+        os.makedirs(destino, exist_ok=True)
+        if self.formato == "parquet":
+            self._escribir_parquet(destino, arreglos, cadenas.valores)
+        else:
+            self._escribir_npy(destino, arreglos, cadenas.valores)
+
+        meta = {
+            "formato": self.formato,
+            "firma": firma,
+            "filas": {tabla: len(next(iter(cols.values()))) for tabla, cols in arreglos.items()},
+            "errores": len(lector.errores),
+        }
+        with open(os.path.join(destino, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=4, ensure_ascii=False)
+        logger.info(
+            f"Partición columnar {rfc}/{anio}/{mes}/{tipo}: {meta['filas']['comprobantes']} comprobantes, "
+            f"{meta['filas']['conceptos']} conceptos."
+        )
+        return meta
+
+    @staticmethod
+    def _agregar(destino, columnas, registro, cadenas):
+        for col, tipo_col in columnas.items():
+            valor = registro.get(col)
+            if tipo_col == "str":
+                valor = cadenas.codigo(valor)
+            elif tipo_col == "centavos":
+                valor = a_centavos(valor)
+            destino[col].append(valor)
+
+    @staticmethod
+    def _arreglo(valores, tipo_col):
+        if tipo_col in ("str", "int"):
+            return np.array(valores, dtype=np.int32)
+        if tipo_col == "centavos":
+            return np.array(valores, dtype=np.int64)
+        if tipo_col == "float":
+            return np.array([float(v) if v not in (None, "") else np.nan for v in valores], dtype=np.float64)
+        return np.array([v or "NaT" for v in valores], dtype="datetime64[s]")
+
+    @staticmethod
+    def _escribir_npy(destino, arreglos, cadenas):
+        for tabla, columnas in arreglos.items():
+            carpeta = os.path.join(destino, tabla)
+            os.makedirs(carpeta, exist_ok=True)
+            for col, arreglo in columnas.items():
+                np.save(os.path.join(carpeta, f"{col}.npy"), arreglo)
+        with open(os.path.join(destino, "cadenas.json"), "w", encoding="utf-8") as f:
+            json.dump(cadenas, f, ensure_ascii=False)
+
+    @staticmethod
+    def _escribir_parquet(destino, arreglos, cadenas):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("El formato 'parquet' requiere pyarrow instalado.")
+
+        diccionario = pa.array(cadenas, type=pa.string())
+        for tabla, columnas in arreglos.items():
+            campos = {}
+            for col, arreglo in columnas.items():
+                if TABLAS[tabla][col] == "str":
+                    indices = pa.array(arreglo, mask=arreglo < 0, type=pa.int32())
+                    campos[col] = pa.DictionaryArray.from_arrays(indices, diccionario)
+                else:
+                    campos[col] = pa.array(arreglo)
+            pq.write_table(pa.table(campos), os.path.join(destino, f"{tabla}.parquet"))
+
+    # ----------------------------------------------------------------- carga
+
+    def cargar(self, rfc, anio, mes, tipo, tabla: str = "comprobantes", mmap: bool = True) -> Particion:
+        """Carga una partición .npy o Parquet; con `mmap` las columnas no se leen a memoria hasta usarse."""
+        if tabla not in TABLAS:
+            raise ValueError(f"Tabla columnar desconocida: {tabla}")
+        destino = self.path_particion(rfc, anio, mes, tipo)
+        meta = self.meta(rfc, anio, mes, tipo)
+        if meta.get("formato") == "parquet":
+            return self._cargar_parquet(destino, tabla, meta, mmap)
+        if meta.get("formato") != "npy":
+            raise FileNotFoundError(f"No hay partición columnar en '{destino}'.")
+
+        modo = "r" if mmap else None
+        columnas = {
+            col: np.load(os.path.join(destino, tabla, f"{col}.npy"), mmap_mode=modo)
+            for col in TABLAS[tabla]
+        }
+        with open(os.path.join(destino, "cadenas.json"), "r", encoding="utf-8") as f:
+            cadenas = json.load(f)
+        return Particion(destino, columnas, cadenas, meta)
+
+    @staticmethod
+    def _cargar_parquet(destino, tabla, meta, mmap) -> Particion:
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("El formato 'parquet' requiere pyarrow instalado.")
+
+        datos = pq.read_table(os.path.join(destino, f"{tabla}.parquet"), memory_map=mmap)
+        codigos = {}  # Tabla de cadenas común: Parquet guarda un diccionario por columna
+        columnas = {}
+        for col, tipo_col in TABLAS[tabla].items():
+            columna = datos.column(col)
+            if tipo_col != "str":
+                columnas[col] = columna.to_numpy()
+                continue
+            columna = columna.unify_dictionaries().combine_chunks()
+            mapa = np.array(
+                [codigos.setdefault(v, len(codigos)) for v in columna.dictionary.to_pylist()] + [-1], dtype=np.int32
+            )
+            columnas[col] = mapa[columna.indices.fill_null(-1).to_numpy()]
+        return Particion(destino, columnas, list(codigos), meta)
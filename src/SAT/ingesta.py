@@ -0,0 +1,143 @@
+import os, sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), ".")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import delete, insert
+from src import LoggerFactory, ModelRegistry
+from .cfdi import LectorCFDI, recorrer_cfdi
+
+logger = LoggerFactory().get_logger("sat", "sat.log", consola=True)
+
+MAX_PARAMETROS_IN = 1000  # SQL Server admite ~2100 parámetros por sentencia
+
+
+def _decimal(valor):
+    return Decimal(valor) if valor not in (None, "") else None
+
+
+def _fecha(valor):
+    return datetime.fromisoformat(valor) if valor else None
+
+
+class IngestaCFDI:
+    """
+    Carga CFDIs parseados (LectorCFDI) a las tablas cfdi_comprobantes y
+    cfdi_conceptos de cualquier DBManager. Cada lote de `lote` comprobantes se
+    escribe en una sola transacción borrando primero sus UUIDs, de modo que
+    volver a cargar un periodo reemplaza los registros en lugar de duplicarlos.
+    Con `nativo=True` las inserciones usan `bulk_load` del gestor (COPY,
+    fast_executemany, ...): más rápido, pero el borrado y la carga ya no
+    comparten transacción.
+    """
+
+    def __init__(self, db, lote: int = 5000, nativo: bool = False):
+        self.db = db
+        self.lote = lote
+        self.nativo = nativo
+        self.Comprobante = ModelRegistry.modelo("ComprobanteCFDI")
+        self.Concepto = ModelRegistry.modelo("ConceptoCFDI")
+        if not self.db.engine:
+            self.db.connect()
+        self.db.create_table(self.Comprobante)
+        self.db.create_table(self.Concepto)
+
+    @staticmethod
+    def _filas(doc):
+        comprobante = {
+            "uuid": doc["uuid"],
+            "rfc": doc.get("rfc"),
+            "version": doc["version"],
+            "serie": doc["serie"],
+            "folio": doc["folio"],
+            "fecha": _fecha(doc["fecha"]),
+            "fecha_timbrado": _fecha(doc["fecha_timbrado"]),
+            "tipo": doc["tipo"],
+            "subtotal": _decimal(doc["subtotal"]),
+            "descuento": _decimal(doc["descuento"]),
+            "total": _decimal(doc["total"]),
+            "moneda": doc["moneda"],
+            "tipo_cambio": _decimal(doc["tipo_cambio"]),
+            "metodo_pago": doc["metodo_pago"],
+            "forma_pago": doc["forma_pago"],
+            "no_certificado": doc["no_certificado"],
+            "emisor_rfc": doc["emisor_rfc"],
+            "emisor_nombre": doc["emisor_nombre"],
+            "receptor_rfc": doc["receptor_rfc"],
+            "receptor_nombre": doc["receptor_nombre"],
+            "iva_trasladado": _decimal(doc["iva_trasladado"]),
+            "iva_retenido": _decimal(doc["iva_retenido"]),
+            "path": doc["path"],
+        }
+        conceptos = [
+            {
+                "uuid": doc["uuid"],
+                "numero": i,
+                "clave_prod_serv": c["clave_prod_serv"],
+                "no_identificacion": c["no_identificacion"],
+                "cantidad": _decimal(c["cantidad"]),
+                "clave_unidad": c["clave_unidad"],
+                "unidad": c["unidad"],
+                "descripcion": c["descripcion"],
+                "valor_unitario": _decimal(c["valor_unitario"]),
+                "importe": _decimal(c["importe"]),
+                "descuento": _decimal(c["descuento"]),
+            }
+            for i, c in enumerate(doc["conceptos"], start=1)
+        ]
+        return comprobante, conceptos
+
+    def _escribir(self, lote: dict) -> int:
+        uuids = list(lote)
+        comprobantes = [c for c, _ in lote.values()]
+        conceptos = [x for _, cs in lote.values() for x in cs]
+        try:
+            with self.db.engine.begin() as conn:
+                for i in range(0, len(uuids), MAX_PARAMETROS_IN):
+                    parte = uuids[i:i + MAX_PARAMETROS_IN]
+                    conn.execute(delete(self.Concepto).where(self.Concepto.uuid.in_(parte)))
+                    conn.execute(delete(self.Comprobante).where(self.Comprobante.uuid.in_(parte)))
+                if not self.nativo:
+                    conn.execute(insert(self.Comprobante), comprobantes)
+                    if conceptos:
+                        conn.execute(insert(self.Concepto), conceptos)
+        finally:
+            # Borrado y carga comparten transacción fuera de la API del gestor:
+            # se avisa igual que sus escrituras (caché y lecturas al primario)
+            self.db._after_write(self.Comprobante)
+            self.db._after_write(self.Concepto)
+        if self.nativo:
+            self.db.bulk_load(self.Comprobante, comprobantes, chunk_size=self.lote)
+            if conceptos:
+                self.db.bulk_load(self.Concepto, conceptos, chunk_size=self.lote)
+        return len(conceptos)
+
+    def cargar(self, docs) -> dict:
+        """Carga un iterable de CFDIs parseados; regresa el conteo de filas escritas."""
+        resumen = {"comprobantes": 0, "conceptos": 0, "omitidos": 0}
+        lote = {}
+        for doc in docs:
+            if not doc.get("uuid"):
+                logger.warning(f"CFDI sin TimbreFiscalDigital, se omite: {doc.get('path')}")
+                resumen["omitidos"] += 1
+                continue
+            lote[doc["uuid"]] = self._filas(doc)  # Un UUID repetido en el lote conserva el último
+            if len(lote) >= self.lote:
+                resumen["conceptos"] += self._escribir(lote)
+                resumen["comprobantes"] += len(lote)
+                lote = {}
+        if lote:
+            resumen["conceptos"] += self._escribir(lote)
+            resumen["comprobantes"] += len(lote)
+
+        logger.info(
+            f"Ingesta CFDI: {resumen['comprobantes']} comprobantes y {resumen['conceptos']} conceptos cargados."
+        )
+        return resumen
+
+    def cargar_periodo(self, base: str = "files", rfc: str = None, anio=None, mes=None, tipo: str = None,
+                       workers: int = None) -> dict:
+        lector = LectorCFDI(workers=workers)
+        return self.cargar(lector.procesar(recorrer_cfdi(base, rfc, anio, mes, tipo)))
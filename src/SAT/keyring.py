@@ -0,0 +1,156 @@
+import os, sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), ".")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from OpenSSL import crypto
+from satcfdi.models import Signer
+from src import LoggerFactory, ModelRegistry
+from .cer import CertSAT
+
+logger = LoggerFactory().get_logger("sat", "sat.log", consola=True)
+
+
+def _utc(fecha):
+    # Las bases guardan `valido_hasta` sin zona horaria; el SAT la emite en UTC
+    if fecha is None or fecha.tzinfo is not None:
+        return fecha
+    return fecha.replace(tzinfo=timezone.utc)
+
+
+class _Entrada:
+    def __init__(self, cert: CertSAT):
+        self.cert = cert
+        self.signer = None
+        self.usado = time.monotonic()
+
+
+class LlaveroSAT:
+    """
+    Llavero de e.firmas por RFC. La primera vez que se pide un RFC se leen
+    files/<RFC>/<RFC>.cer y .key (la contraseña de key.txt o de la tabla
+    certificados si se da `db`) y la llave se descifra una sola vez; después
+    se sirve desde un LRU de a lo más `max_llaves` entradas que además expira
+    las que llevan `inactividad` segundos sin usarse. La vigencia
+    (`valido_hasta`) de cada RFC se recuerda aunque su llave salga del LRU, de
+    modo que un certificado vencido se rechaza sin volver a leer archivos.
+    """
+
+    def __init__(self, base: str = "files", db=None, max_llaves: int = 32, inactividad: float = 900):
+        self.base = base
+        self.db = db
+        self.max_llaves = max_llaves
+        self.inactividad = inactividad
+        self._llaves = OrderedDict()  # RFC -> _Entrada
+        self._vigencias = {}  # RFC -> valido_hasta (UTC)
+        self._lock = threading.Lock()
+
+    def rutas(self, rfc: str) -> tuple:
+        carpeta = os.path.join(self.base, rfc)
+        return (
+            os.path.join(carpeta, f"{rfc}.cer"),
+            os.path.join(carpeta, f"{rfc}.key"),
+            os.path.join(carpeta, "key.txt"),
+        )
+
+    def _registro(self, rfc: str):
+        if self.db is None:
+            return None
+        if not self.db.engine:
+            self.db.connect()
+        return self.db.get_record(ModelRegistry.modelo("CertificadoSAT"), rfc)
+
+    def _verificar_vigencia(self, rfc: str):
+        valido_hasta = self._vigencias.get(rfc)
+        if valido_hasta is not None and valido_hasta <= datetime.now(timezone.utc):
+            raise ValueError(f"El certificado de {rfc} venció el {valido_hasta.isoformat()}.")
+
+    def _cargar(self, rfc: str) -> CertSAT:
+        path_cer, path_key, path_pwd = self.rutas(rfc)
+        registro = self._registro(rfc)
+        if registro is not None and registro.valido_hasta is not None:
+            self._vigencias[rfc] = _utc(registro.valido_hasta)
+            self._verificar_vigencia(rfc)
+
+        if not os.path.exists(path_cer) or not os.path.exists(path_key):
+            raise FileNotFoundError(f"No se encontró la e.firma de {rfc} en '{os.path.dirname(path_cer)}'.")
+        pwd = registro.pwd if registro is not None and registro.pwd else None
+        if pwd is None and not os.path.exists(path_pwd):
+            raise FileNotFoundError(f"No hay contraseña para la llave de {rfc}.")
+
+        cert = CertSAT(path_cer, path_key, None if pwd else path_pwd, pwd=pwd)
+        # La más restrictiva entre la vigencia registrada y la del propio certificado
+        valido_hasta = cert.cert.not_valid_after_utc
+        self._vigencias[rfc] = min(self._vigencias.get(rfc) or valido_hasta, valido_hasta)
+        self._verificar_vigencia(rfc)
+        cert.validar_correspondencia(cert.cert)  # Descifra la llave una sola vez
+        logger.info(f"Llave de {rfc} cargada en el llavero.")
+        return cert
+
+    def _purgar(self, ahora: float):
+        # Llamar con el lock tomado. Las entradas desalojadas sólo se sueltan (no
+        # se cierran): quien aún tenga su CertSAT o Signer puede seguir firmando.
+        for rfc in [rfc for rfc, e in self._llaves.items() if ahora - e.usado > self.inactividad]:
+            del self._llaves[rfc]
+        while len(self._llaves) > self.max_llaves:
+            self._llaves.popitem(last=False)
+
+    def _entrada(self, rfc: str) -> _Entrada:
+        rfc = rfc.strip().upper()
+        self._verificar_vigencia(rfc)
+        ahora = time.monotonic()
+        with self._lock:
+            self._purgar(ahora)
+            entrada = self._llaves.get(rfc)
+            if entrada is not None:
+                entrada.usado = ahora
+                self._llaves.move_to_end(rfc)
+                return entrada
+
+        # El descifrado ocurre fuera del lock para no detener a los demás RFCs
+        entrada = _Entrada(self._cargar(rfc))
+        with self._lock:
+            actual = self._llaves.get(rfc)
+            if actual is not None:
+                return actual
+            self._llaves[rfc] = entrada
+            self._purgar(time.monotonic())
+        return entrada
+
+    def cert(self, rfc: str) -> CertSAT:
+        """CertSAT con la llave ya descifrada para `rfc`."""
+        return self._entrada(rfc).cert
+
+    def signer(self, rfc: str) -> Signer:
+        """Signer de satcfdi construido con la llave ya descifrada (sin volver a leer archivos)."""
+        entrada = self._entrada(rfc)
+        if entrada.signer is None:
+            cert = entrada.cert
+            entrada.signer = Signer(certificate=crypto.X509.from_cryptography(cert.cert), key=cert.private_key)
+        return entrada.signer
+
+    def olvidar(self, rfc: str = None):
+        """Descarta la llave de `rfc` (o todas), p. ej. tras renovar la e.firma."""
+        with self._lock:
+            rfcs = [rfc.strip().upper()] if rfc else list(self._llaves)
+            for r in rfcs:
+                entrada = self._llaves.pop(r, None)
+                if entrada is not None:
+                    entrada.cert.close()
+                self._vigencias.pop(r, None)
+
+    def close(self):
+        self.olvidar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return len(self._llaves)
@@ -0,0 +1,151 @@
+import os, sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), ".")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+import json
+import base64
+import satcfdi
+from lxml import etree
+from src import LoggerFactory
+from .cer import CertSAT
+from .cfdi import LectorCFDI, RutaCFDI, NS_CFDI, NS_TFD, recorrer_cfdi
+
+logger = LoggerFactory().get_logger("sat", "sat.log", consola=True)
+
+# XSLT de cadena original que trae satcfdi, por namespace de Comprobante
+_XSLT_PATH = os.path.join(os.path.dirname(satcfdi.__file__), "transform", "schemas", "www.sat.gob.mx",
+                          "sitio_internet", "cfd")
+XSLT_CADENA = {
+    f"{{{NS_CFDI['3']}}}Comprobante": os.path.join(_XSLT_PATH, "3", "cadenaoriginal_3_3", "cadenaoriginal_3_3.xslt"),
+    f"{{{NS_CFDI['4']}}}Comprobante": os.path.join(_XSLT_PATH, "4", "cadenaoriginal_4_0", "cadenaoriginal_4_0.xslt"),
+}
+_TIMBRE = f"{{{NS_TFD}}}TimbreFiscalDigital"
+
+MAX_CERTIFICADOS = 4096  # Certificados distintos retenidos por proceso antes de vaciar la caché
+
+# Estado por proceso: cada worker del pool compila las XSLT y decodifica cada
+# certificado una sola vez y los reutiliza en todos los lotes que recibe.
+_xslt = {}  # tag de Comprobante -> etree.XSLT
+_certificados = {}  # NoCertificado -> (Certificado en base64, CertSAT)
+# Algunos CFDIs descargados declaran atributos xmlns:* inválidos; si el parseo
+# estricto falla se reintenta tolerante y el propio Sello decide su validez.
+_parser_tolerante = etree.XMLParser(recover=True)
+
+
+def _cadena_original(doc) -> bytes:
+    tag = doc.getroot().tag
+    transformar = _xslt.get(tag)
+    if transformar is None:
+        transformar = _xslt[tag] = etree.XSLT(etree.parse(XSLT_CADENA[tag]))
+    return bytes(transformar(doc))
+
+
+def _certificado(no_certificado: str, certificado: str):
+    """CertSAT del emisor; regresa (cert, motivo). Sólo se decodifica la primera vez que aparece cada NoCertificado."""
+    guardado = _certificados.get(no_certificado)
+    if guardado is not None and guardado[0] == certificado:
+        return guardado[1], None
+
+    try:
+        cert = CertSAT.desde_der(base64.b64decode(certificado))
+        no_cert = cert.no_certificado
+    except Exception as e:
+        return None, f"Certificado ilegible: {e}"
+    if no_cert != no_certificado:
+        return None, f"NoCertificado {no_certificado} no corresponde al Certificado ({no_cert})."
+    if guardado is None:
+        if len(_certificados) >= MAX_CERTIFICADOS:
+            _certificados.clear()
+        _certificados[no_certificado] = (certificado, cert)
+    return cert, None
+
+
+def verificar_sello(path: str) -> dict:
+    """Verifica el Sello de un CFDI contra su Certificado y su cadena original."""
+    resultado = {"path": str(path), "uuid": None, "no_certificado": None, "valido": False, "motivo": None}
+    try:
+        doc = etree.parse(path)
+    except etree.XMLSyntaxError:
+        doc = None
+    except Exception as e:
+        resultado["motivo"] = f"XML ilegible: {e}"
+        return resultado
+    if doc is None:
+        try:
+            doc = etree.parse(path, _parser_tolerante)
+        except Exception as e:
+            resultado["motivo"] = f"XML ilegible: {e}"
+            return resultado
+        if doc.getroot() is None:
+            resultado["motivo"] = "XML ilegible."
+            return resultado
+
+    raiz = doc.getroot()
+    if raiz.tag not in XSLT_CADENA:
+        resultado["motivo"] = "El archivo no contiene un cfdi:Comprobante 3.3 o 4.0."
+        return resultado
+    timbre = next(raiz.iter(_TIMBRE), None)
+    if timbre is not None:
+        resultado["uuid"] = (timbre.get("UUID") or "").upper() or None
+
+    a = raiz.attrib
+    no_certificado, certificado, sello = a.get("NoCertificado"), a.get("Certificado"), a.get("Sello")
+    resultado["no_certificado"] = no_certificado
+    if not (no_certificado and certificado and sello):
+        resultado["motivo"] = "Falta Sello, Certificado o NoCertificado."
+        return resultado
+
+    cert, motivo = _certificado(no_certificado, certificado)
+    if cert is None:
+        resultado["motivo"] = motivo
+        return resultado
+    try:
+        cadena = _cadena_original(doc)
+    except Exception as e:
+        resultado["motivo"] = f"No se pudo generar la cadena original: {e}"
+        return resultado
+
+    resultado["valido"] = cert.validar_firma(cadena, sello)
+    if not resultado["valido"]:
+        resultado["motivo"] = "El Sello no corresponde a la cadena original."
+    return resultado
+
+
+def _verificar_lote(rutas):
+    resultados = []
+    for ruta in rutas:
+        resultado = verificar_sello(ruta.path if isinstance(ruta, RutaCFDI) else ruta)
+        if isinstance(ruta, RutaCFDI):
+            resultado.update(rfc=ruta.rfc, anio=ruta.anio, mes=ruta.mes, emisor=ruta.emisor)
+        resultados.append(resultado)
+    return resultados
+
+
+class VerificadorSellos(LectorCFDI):
+    """
+    Verificación masiva del Sello de los CFDIs sobre el mismo pool por lotes
+    de LectorCFDI. Cada worker compila la XSLT de cadena original una vez y
+    guarda los certificados por NoCertificado, de modo que el base64 de un
+    emisor se decodifica una sola vez aunque aparezca en miles de facturas.
+    """
+
+    def _trabajo(self):
+        return _verificar_lote
+
+    def verificar(self, base: str = "files", rfc: str = None, anio=None, mes=None, tipo: str = None,
+                  emisor: str = None, destino: str = None) -> dict:
+        """Recorre files/<RFC>/RECIBIDOS y regresa (y opcionalmente guarda en `destino`) el reporte de inválidos."""
+        reporte = {"total": 0, "validos": 0, "invalidos": []}
+        for resultado in self.procesar(recorrer_cfdi(base, rfc, anio, mes, tipo, emisor)):
+            reporte["total"] += 1
+            if resultado["valido"]:
+                reporte["validos"] += 1
+            else:
+                reporte["invalidos"].append(resultado)
+
+        logger.info(f"Sellos verificados: {reporte['total']}, inválidos: {len(reporte['invalidos'])}.")
+        if destino is not None:
+            with open(destino, "w", encoding="utf-8") as f:
+                json.dump(reporte, f, indent=4, ensure_ascii=False)
+        return reporte
@@ -11,12 +11,15 @@ from satcfdi.pacs.sat import SAT, EstadoSolicitud, TipoDescargaMasivaTerceros
 
 
 class WSSAT:
-    def __init__(self, cer, key, passwd):
-        self.firmante = Signer.load(
-            certificate=open(cer, "rb").read(),
-            key=open(key, "rb").read(),
-            password=open(passwd, "r").read().strip(),
-        )
+    def __init__(self, cer=None, key=None, passwd=None, firmante: Signer = None):
+        # `firmante` permite reutilizar un Signer ya cargado (p. ej. LlaveroSAT.signer)
+        if firmante is None:
+            firmante = Signer.load(
+                certificate=open(cer, "rb").read(),
+                key=open(key, "rb").read(),
+                password=open(passwd, "r").read().strip(),
+            )
+        self.firmante = firmante
         self.Servicio = SAT(signer=self.firmante)
 
         # Mapeo legible de estados
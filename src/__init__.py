@@ -2,19 +2,34 @@ import sys, os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), ".")))
 
 from .utils.variablesambiente import VarEnv
-from .utils.net import is_host_alive
+from .utils.net import is_host_alive, is_port_open
 from .utils.tokenmanager import TokenManager
 from .utils.logger import LoggerFactory
 
 from .LDAP.ActiveDirectory import AuthUser,User
 
-from .DB.BaseDBM import Base, DataBaseFail, BaseDBManager
+from .DB.EngineRegistry import EngineRegistry
+from .DB.QueryCache import QueryCache
+from .DB.Instrumentation import DBStats
+from .DB.ReadRouter import ReadRouter
+from .DB.CircuitBreaker import CircuitBreaker
+from .DB.BaseDBM import Base, DataBaseFail, DataBaseUnavailable, BaseDBManager
 from .DB.MSSQLDBM import MSSQLDBManager
 from .DB.MySQLDBM import MySQLDBManager
 from .DB.PostgreSQLDBM import PostgreSQLDBManager
 from .DB.SQLiteDBM import SQLiteDBManager
+from .DB.AsyncDBM import AsyncBaseDBManager, AsyncExecutorDBManager
 from .DB.DbManagerFactory import DBFactory
+from .DB.Export import Exporter, EXPORT_FORMATS
+from .DB.ModelRegistry import ModelRegistry
 
 from .SAT.cer import CertSAT
 from .SAT.ws import WSSAT
+from .SAT.keyring import LlaveroSAT
 
+from .SAT.cfdi import LectorCFDI, RutaCFDI, leer_cfdi, recorrer_cfdi
+from .SAT.catalogo import IndiceCFDI
+from .SAT.columnar import ColumnarCFDI
+from .SAT.agregados import AgregadorCFDI
+from .SAT.ingesta import IngestaCFDI
+from .SAT.sellos import VerificadorSellos, verificar_sello
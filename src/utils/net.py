@@ -1,3 +1,4 @@
+import socket
 import platform
 import subprocess
 
@@ -18,3 +19,11 @@ def is_host_alive(ip: str) -> bool:
     except Exception as e:
         print(f"[!] Error al hacer ping a {ip}: {e}")
         return False
+
+def is_port_open(host: str, port: int, timeout: float = 1.0) -> bool:
+    """Prueba TCP rápida: ¿acepta conexiones `host:port` dentro de `timeout` segundos?"""
+    try:
+        with socket.create_connection((host, int(port)), timeout=timeout):
+            return True
+    except OSError:
+        return False
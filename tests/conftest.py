@@ -0,0 +1,50 @@
+import os, sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import pytest
+from sqlalchemy import Column, Integer, String
+from src import Base, EngineRegistry, BaseDBManager, SQLiteDBManager
+
+# Archivo de ejemplo del repositorio: files/<RFC>/RECIBIDOS/<año>/<mes>/...
+FILES = os.path.abspath(os.path.join(os.path.dirname(__file__), "../files"))
+RFC = "EXP6812035X3"
+
+
+class Item(Base):
+    __tablename__ = "test_items"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+
+
+class Folio(Base):
+    """Llave compuesta de tres columnas, como los conceptos de un CFDI."""
+    __tablename__ = "test_folios"
+
+    serie = Column(String(10), primary_key=True)
+    anio = Column(Integer, primary_key=True)
+    numero = Column(Integer, primary_key=True)
+    name = Column(String(50))
+
+
+@pytest.fixture(autouse=True)
+def _engines_limpios():
+    # Engines y tablas verificadas son del proceso: cada prueba empieza sin ellos
+    yield
+    EngineRegistry.dispose_all()
+    BaseDBManager.invalidate_database_check()
+    with BaseDBManager._verified_lock:
+        BaseDBManager._verified_tables.clear()
+
+
+@pytest.fixture
+def sqlite_file(tmp_path):
+    """Crea una base SQLite con la tabla de prueba y las filas dadas; regresa su ruta."""
+    def crear(nombre, *nombres):
+        path = str(tmp_path / nombre)
+        with SQLiteDBManager(path) as db:
+            db.create_table(Item)
+            db.add_records(Item, [{"id": i, "name": n} for i, n in enumerate(nombres, start=1)])
+        return path
+    return crear
@@ -0,0 +1,50 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+from src import AgregadorCFDI, ColumnarCFDI
+from src.SAT.columnar import TABLAS
+from conftest import FILES, RFC
+
+
+@pytest.fixture
+def base(tmp_path):
+    """Copia del mes 2020/1 de la muestra del repositorio."""
+    origen = os.path.join(FILES, RFC, "RECIBIDOS", "2020", "1")
+    shutil.copytree(origen, tmp_path / RFC / "RECIBIDOS" / "2020" / "1")
+    return str(tmp_path)
+
+
+def test_resultado_memorizado_no_se_corrompe(base):
+    agregador = AgregadorCFDI(ColumnarCFDI(base=base, workers=1))
+    primero = agregador.totales_mes(RFC, 2020, 1)
+    esperado = [dict(f) for f in primero]
+    primero[0]["total"] = 0
+    primero.clear()
+    assert agregador.totales_mes(RFC, 2020, 1) == esperado
+
+
+def test_parquet_y_npy_dan_los_mismos_totales(base):
+    pytest.importorskip("pyarrow")
+    npy = AgregadorCFDI(ColumnarCFDI(base=base, destino="NPY", workers=1)).totales_mes(RFC, 2020, 1)
+    parquet = AgregadorCFDI(ColumnarCFDI(base=base, destino="PARQUET", formato="parquet", workers=1))
+    assert parquet.totales_mes(RFC, 2020, 1) == npy
+    assert sum(f["comprobantes"] for f in npy) == 242
+
+
+def test_parquet_conserva_cadenas_y_nulos(base):
+    pytest.importorskip("pyarrow")
+    columnar = ColumnarCFDI(base=base, destino="NPY", workers=1)
+    columnar.exportar(RFC, 2020, 1)
+    parquet = ColumnarCFDI(base=base, destino="PARQUET", formato="parquet", workers=1)
+    parquet.exportar(RFC, 2020, 1)
+    for particion in columnar.particiones(RFC, 2020, 1):
+        for tabla in ("comprobantes", "conceptos"):
+            a = columnar.cargar(*particion, tabla=tabla)
+            b = parquet.cargar(*particion, tabla=tabla)
+            for col, tipo_col in TABLAS[tabla].items():
+                if tipo_col == "str":
+                    assert list(a.texto(col)) == list(b.texto(col))
+                else:
+                    np.testing.assert_array_equal(np.asarray(a[col]), np.asarray(b[col]))
@@ -0,0 +1,53 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import Column, DateTime, Integer, MetaData, Sequence, String, Table, func, text
+from modelos import SolicitudSAT
+from src import BaseDBManager, SQLiteDBManager
+from conftest import Item
+
+
+def _tabla(*columnas):
+    return Table("test_bulk", MetaData(), Column("id", Integer, primary_key=True), *columnas)
+
+
+def test_bulk_rows_aplica_defaults_de_python():
+    tabla = _tabla(Column("estado", String, default="pendiente"), Column("n", Integer, default=lambda: 7))
+    columnas, filas = BaseDBManager._bulk_rows(tabla, [{"id": 1}, {"id": 2}])
+    assert columnas == ["id", "estado", "n"]
+    assert filas == [(1, "pendiente", 7), (2, "pendiente", 7)]
+
+
+def test_bulk_rows_deja_al_servidor_los_defaults_sql():
+    tabla = _tabla(Column("creado", DateTime, default=func.now(), server_default=text("CURRENT_TIMESTAMP")))
+    assert BaseDBManager._bulk_rows(tabla, [{"id": 1}]) == (["id"], [(1,)])
+
+    con_secuencia = Table("test_seq", MetaData(), Column("id", Integer, Sequence("test_seq_id"), primary_key=True),
+                          Column("nombre", String))
+    assert BaseDBManager._bulk_rows(con_secuencia, [{"nombre": "a"}]) == (["nombre"], [("a",)])
+
+
+def test_bulk_rows_rechaza_default_sql_sin_server_default():
+    tabla = _tabla(Column("creado", DateTime, default=func.now()))
+    with pytest.raises(ValueError, match="creado"):
+        BaseDBManager._bulk_rows(tabla, [{"id": 1}])
+    # Con el valor en los registros no se necesita el default
+    assert BaseDBManager._bulk_rows(tabla, [{"id": 1, "creado": None}]) == (["id", "creado"], [(1, None)])
+
+
+def test_bulk_load_sqlite(tmp_path):
+    with SQLiteDBManager(str(tmp_path / "bulk.sqlite"), cache=True) as db:
+        db.create_table(Item)
+        assert db.get_records(Item) == []
+        assert db.bulk_load(Item, ({"id": i, "name": f"n{i}"} for i in range(1, 2501)), chunk_size=1000) == 2500
+        assert len(db.get_records(Item)) == 2500  # La caché se invalidó tras la carga
+        with db.engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 2  # FULL restaurado
+
+
+def test_bulk_load_sqlite_con_defaults(tmp_path):
+    with SQLiteDBManager(str(tmp_path / "bulk.sqlite")) as db:
+        db.create_table(SolicitudSAT)
+        db.bulk_load(SolicitudSAT, [{"id": "a", "fi": date(2020, 1, 1), "ff": date(2020, 1, 31)}])
+        solicitud = db.get_record(SolicitudSAT, "a")
+    assert solicitud.estado == "pendiente" and solicitud.solicitado is not None
@@ -0,0 +1,79 @@
+import os
+import shutil
+
+import pytest
+from src import IndiceCFDI, recorrer_cfdi
+from conftest import FILES, RFC
+
+_MUESTRA = [r.path for _, r in zip(range(6), recorrer_cfdi(FILES, RFC))]
+
+
+@pytest.fixture
+def archivo(tmp_path):
+    """files/<RFC>/RECIBIDOS/2020/1/I/<emisor>/ con CFDIs reales de la muestra del repositorio."""
+    base = tmp_path / "files"
+    muestra = iter(_MUESTRA)
+
+    def copiar(emisor, n=1, tipo="I"):
+        carpeta = base / RFC / "RECIBIDOS" / "2020" / "1" / tipo / emisor
+        carpeta.mkdir(parents=True, exist_ok=True)
+        for _ in range(n):
+            origen = next(muestra)
+            shutil.copy(origen, carpeta / os.path.basename(origen))
+        return carpeta
+
+    copiar.base = str(base)
+    return copiar
+
+
+def _indice(archivo, tmp_path):
+    return IndiceCFDI(base=archivo.base, db_path=str(tmp_path / "catalogo.sqlite"), workers=1)
+
+
+def test_rescan_sin_cambios_no_parsea(archivo, tmp_path):
+    archivo("AAA010101AAA", 2)
+    with _indice(archivo, tmp_path) as indice:
+        assert indice.actualizar()["nuevos"] == 2
+        resumen = indice.actualizar()
+        assert resumen["nuevos"] == 0 and resumen["eliminados"] == 0
+        assert len(indice.buscar(rfc=RFC)) == 2
+
+
+def test_archivos_nuevos_modificados_y_borrados(archivo, tmp_path):
+    carpeta = archivo("AAA010101AAA", 2)
+    with _indice(archivo, tmp_path) as indice:
+        indice.actualizar()
+
+        archivo("AAA010101AAA", 1)
+        assert indice.actualizar()["nuevos"] == 1
+
+        primero = sorted(carpeta.iterdir())[0]
+        with open(primero, "ab") as f:
+            f.write(b"\n")
+        assert indice.actualizar(completo=True)["nuevos"] == 1
+
+        primero.unlink()
+        resumen = indice.actualizar()
+        assert resumen["eliminados"] == 1
+        assert len(indice.buscar(rfc=RFC)) == 2
+
+
+def test_borrar_carpeta_no_toca_hermanas_con_comodines(archivo, tmp_path):
+    # LIKE 'I_/%' también coincidiría con 'IA/...'
+    con_guion = archivo("AAA010101AAA", 1, tipo="I_").parent
+    archivo("BBB010101BBB", 2, tipo="IA")
+    with _indice(archivo, tmp_path) as indice:
+        indice.actualizar()
+        shutil.rmtree(con_guion)
+        resumen = indice.actualizar()
+        assert resumen["eliminados"] == 1
+        assert {c.tipo for c in indice.buscar(rfc=RFC)} == {"IA"}
+        assert indice.actualizar()["nuevos"] == 0
+
+
+def test_ubicar_por_uuid(archivo, tmp_path):
+    carpeta = archivo("AAA010101AAA", 1)
+    with _indice(archivo, tmp_path) as indice:
+        indice.actualizar()
+        catalogado = indice.buscar(rfc=RFC)[0]
+        assert indice.ubicar(catalogado.uuid.lower()) == str(next(carpeta.iterdir()))
@@ -0,0 +1,28 @@
+import gc
+
+import pytest
+from src import LectorCFDI, leer_cfdi, recorrer_cfdi
+from conftest import FILES, RFC
+
+
+@pytest.mark.filterwarnings("error::ResourceWarning", "error::pytest.PytestUnraisableExceptionWarning")
+def test_leer_cfdi_cierra_el_archivo():
+    ruta = next(recorrer_cfdi(FILES, RFC))
+    for con_hash in (False, True):
+        doc = leer_cfdi(ruta.path, con_hash)
+        assert doc["uuid"] == ruta.uuid
+    assert len(doc["hash"]) == 64
+    gc.collect()  # Un archivo sin cerrar avisa (ResourceWarning) al recolectarse
+
+
+def test_archivo_sin_comprobante(tmp_path):
+    path = tmp_path / "vacio.xml"
+    path.write_text("<otro/>", encoding="utf-8")
+    with pytest.raises(ValueError):
+        leer_cfdi(str(path))
+
+
+def test_lector_en_paralelo_conserva_el_orden():
+    rutas = [r for _, r in zip(range(20), recorrer_cfdi(FILES, RFC))]
+    docs = list(LectorCFDI(workers=2, lote=3).procesar(rutas))
+    assert [d["uuid"] for d in docs] == [r.uuid for r in rutas]
@@ -0,0 +1,134 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+import src.DB.BaseDBM as basedbm
+import src.DB.CircuitBreaker as modulo
+from src import AsyncBaseDBManager, CircuitBreaker, DataBaseUnavailable, SQLiteDBManager
+from conftest import Item
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    ahora = [1000.0]
+    monkeypatch.setattr(modulo.time, "monotonic", lambda: ahora[0])
+    return ahora
+
+
+def test_abre_tras_fallos_seguidos(reloj):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    breaker.failure()
+    breaker.failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.retry_after() == 30
+
+
+def test_exito_reinicia_el_conteo(reloj):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.failure()
+    breaker.success()
+    breaker.failure()
+    assert breaker.state == "closed"
+
+
+def test_half_open_deja_pasar_una_sola_prueba(reloj):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.failure()
+    reloj[0] += 31
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+    breaker.success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_falla_en_half_open_vuelve_a_abrir(reloj):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.failure()
+    reloj[0] += 31
+    assert breaker.allow()
+    breaker.failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_guard_connect_sin_timeout_no_prueba_el_puerto(monkeypatch):
+    def no_llamar(*args, **kwargs):
+        raise AssertionError("prueba TCP en el event loop")
+
+    monkeypatch.setattr(basedbm, "is_port_open", no_llamar)
+    breaker = CircuitBreaker(failure_threshold=1)
+    basedbm._guard_connect(breaker, ("db", 5432), None, None, None, (), {})
+
+    breaker.failure()
+    with pytest.raises(DataBaseUnavailable):
+        basedbm._guard_connect(breaker, ("db", 5432), None, None, None, (), {})
+
+
+def test_puerto_cerrado_cuenta_como_fallo(monkeypatch):
+    monkeypatch.setattr(basedbm, "is_port_open", lambda *a, **k: False)
+    breaker = CircuitBreaker(failure_threshold=1)
+    with pytest.raises(DataBaseUnavailable):
+        basedbm._guard_connect(breaker, ("db", 5432), 0.1, None, None, (), {})
+    assert breaker.state == "open"
+
+
+def test_engine_async_no_bloquea_con_la_prueba_tcp(sqlite_file, monkeypatch):
+    path = sqlite_file("async.sqlite", "a")
+    manager = SQLiteDBManager(path)
+    # Un destino de red simulado: interruptor activo y endpoint
+    manager.breaker = CircuitBreaker()
+    monkeypatch.setattr(manager, "_endpoint", lambda: ("db", 5432))
+    monkeypatch.setattr(basedbm, "is_port_open", lambda *a, **k: pytest.fail("prueba TCP en el event loop"))
+
+    async def leer():
+        db = AsyncBaseDBManager(lambda: manager)
+        async with db:
+            return [r.name for r in await db.get_records(Item)]
+
+    assert asyncio.run(leer()) == ["a"]
+
+
+def _en_red(manager, monkeypatch, caidos=()):
+    # Cada archivo SQLite simula un servidor de red propio; `caidos` no abren el puerto
+    manager.breaker = CircuitBreaker(failure_threshold=3)
+    monkeypatch.setattr(manager, "_url_endpoint", lambda uri: (str(uri), 5432))
+    monkeypatch.setattr(manager, "_endpoint", lambda: (manager.database_uri, 5432))
+    monkeypatch.setattr(basedbm, "is_port_open", lambda host, port, timeout: not any(c in host for c in caidos))
+    return manager
+
+
+def test_replica_caida_no_abre_el_circuito_del_primario(sqlite_file, tmp_path, monkeypatch):
+    primario = sqlite_file("primario.sqlite", "primario")
+    r1 = sqlite_file("r1.sqlite", "r1")
+    caida = str(tmp_path / "caida.sqlite")
+    manager = _en_red(SQLiteDBManager(primario, replicas=[caida, r1], replica_eject_seconds=0),
+                      monkeypatch, caidos=["caida"])
+
+    with manager as db:
+        for _ in range(6):
+            assert [i.name for i in db.get_records(Item)] in (["r1"], ["primario"])
+        assert db.breaker.state == "closed"
+        assert CircuitBreaker.for_key(db._url_key(db.replica_uris[0])).state == "open"
+
+
+def test_circuito_del_primario_abierto_no_bloquea_la_replica(sqlite_file, monkeypatch):
+    primario = sqlite_file("primario.sqlite", "primario")
+    r1 = sqlite_file("r1.sqlite", "r1")
+    manager = _en_red(SQLiteDBManager(primario, replicas=[r1]), monkeypatch)
+
+    with manager as db:
+        for _ in range(3):
+            db.breaker.failure()
+        assert [i.name for i in db.get_records(Item)] == ["r1"]
+        assert list(db.stream_records(Item, columns=["name"])) == [("r1",)]
+
+
+def test_pre_ping_fallido_no_cuenta_como_fallo():
+    breaker = CircuitBreaker(failure_threshold=1)
+    contexto = SimpleNamespace(connection=None, original_exception=Exception("stale"), is_pre_ping=True)
+    basedbm._connect_failed(breaker, contexto)
+    assert breaker.state == "closed"
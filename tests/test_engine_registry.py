@@ -0,0 +1,29 @@
+from src import EngineRegistry, SQLiteDBManager
+from conftest import Item
+
+
+def test_gestores_del_mismo_destino_comparten_engine(sqlite_file):
+    path = sqlite_file("a.sqlite", "uno")
+    with SQLiteDBManager(path) as a, SQLiteDBManager(path) as b:
+        assert a.engine is b.engine
+        assert [i.name for i in b.get_records(Item)] == ["uno"]
+        compartido = a.engine
+    # Cerrar los gestores no libera el engine compartido
+    with SQLiteDBManager(path) as c:
+        assert c.engine is compartido
+
+
+def test_destinos_distintos_no_comparten_engine(sqlite_file):
+    with SQLiteDBManager(sqlite_file("a.sqlite", "a")) as a, SQLiteDBManager(sqlite_file("b.sqlite", "b")) as b:
+        assert a.engine is not b.engine
+        assert [i.name for i in a.get_records(Item)] == ["a"]
+        assert [i.name for i in b.get_records(Item)] == ["b"]
+
+
+def test_dispose_all_vacia_el_registro(sqlite_file):
+    path = sqlite_file("a.sqlite", "uno")
+    with SQLiteDBManager(path) as db:
+        anterior = db.engine
+    EngineRegistry.dispose_all()
+    with SQLiteDBManager(path) as db:
+        assert db.engine is not anterior
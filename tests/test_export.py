@@ -0,0 +1,65 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from modelos import CertificadoSAT, SolicitudSAT
+from src import Exporter, SQLiteDBManager
+from routes import dbm
+from conftest import Item
+
+
+@pytest.fixture
+def certificados(tmp_path):
+    path = str(tmp_path / "certificados.sqlite")
+    with SQLiteDBManager(path) as db:
+        db.create_table(CertificadoSAT)
+        db.add_record(CertificadoSAT(rfc_empresa="EXP6812035X3", razon_social="Empresa", pwd="secreto"))
+    return path
+
+
+@pytest.fixture
+def cliente():
+    app = FastAPI()
+    app.include_router(dbm.router, prefix="/dbm")
+    return TestClient(app)
+
+
+def _ndjson(bloques):
+    return [json.loads(linea) for linea in b"".join(bloques).decode("utf-8").splitlines()]
+
+
+def test_csv_por_bloques(sqlite_file):
+    path = sqlite_file("export.sqlite", *[f"n{i}" for i in range(5)])
+    with SQLiteDBManager(path) as db:
+        bloques = list(Exporter(db, chunk_size=2).table(Item, "csv"))
+    assert len(bloques) == 3
+    lineas = b"".join(bloques).decode("utf-8").lstrip("\ufeff").splitlines()
+    assert lineas[0] == "id,name" and lineas[-1] == "5,n4"
+
+
+def test_columnas_sensibles_solo_si_se_piden(certificados):
+    with SQLiteDBManager(certificados) as db:
+        filas = _ndjson(Exporter(db).table(CertificadoSAT, "ndjson"))
+        assert "pwd" not in filas[0] and filas[0]["razon_social"] == "Empresa"
+        filas = _ndjson(Exporter(db).table(CertificadoSAT, "ndjson", columns=["rfc_empresa", "pwd"]))
+        assert filas == [{"rfc_empresa": "EXP6812035X3", "pwd": "secreto"}]
+
+
+def test_errores_de_consulta_al_llamar(tmp_path):
+    with SQLiteDBManager(str(tmp_path / "vacia.sqlite")) as db:
+        with pytest.raises(Exception, match="no such table"):
+            Exporter(db).table(SolicitudSAT, "csv")
+
+
+def test_ruta_no_exporta_pwd(certificados, cliente):
+    respuesta = cliente.get("/dbm/exportar", params={"tipo": "sqlite", "base": certificados, "tabla": "certificados"})
+    assert respuesta.status_code == 200
+    assert b"secreto" not in respuesta.content and b"Empresa" in respuesta.content
+
+
+def test_ruta_tabla_inexistente_responde_error(tmp_path, cliente):
+    respuesta = cliente.get("/dbm/exportar", params={"tipo": "sqlite", "base": str(tmp_path / "vacia.sqlite"),
+                                                    "tabla": "SolicitudSAT"})
+    assert respuesta.status_code == 500
+    assert "no such table" in respuesta.json()["detail"]
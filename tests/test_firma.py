@@ -0,0 +1,65 @@
+import os
+import json
+import hashlib
+
+import pytest
+from src import CertSAT
+from src.SAT.cer import BLOQUE_HASH
+from conftest import FILES, RFC
+
+
+@pytest.fixture
+def cert():
+    base = os.path.join(FILES, RFC)
+    with CertSAT(os.path.join(base, f"{RFC}.cer"), os.path.join(base, f"{RFC}.key"),
+                 os.path.join(base, "key.txt")) as cert:
+        yield cert
+
+
+@pytest.fixture
+def archivo(tmp_path):
+    # Más de un bloque de lectura, con el último incompleto
+    path = tmp_path / "reporte.bin"
+    path.write_bytes(os.urandom(2 * BLOQUE_HASH + 12345))
+    return str(path)
+
+
+def _sidecar_anterior(cert, path):
+    """.firma.json como lo generaba la versión que firmaba el contenido completo."""
+    with open(path, "rb") as f:
+        contenido = f.read()
+    datos = {"archivo": os.path.basename(path), "firma": cert.firmar(contenido),
+             "hash": hashlib.sha256(contenido).hexdigest()}
+    with open(f"{path}.firma.json", "w", encoding="utf-8") as f:
+        json.dump(datos, f, indent=4, ensure_ascii=False)
+    return datos
+
+
+def test_firma_anterior_se_verifica_con_el_digest(cert, archivo):
+    datos = _sidecar_anterior(cert, archivo)
+    resultado = cert.verificar_firma_desde_json(archivo, f"{archivo}.firma.json")
+    assert resultado["detalle"] == "Verificación completa exitosa."
+    assert cert.verificar_firma_archivo(archivo, datos["firma"])
+
+
+def test_firma_nueva_se_verifica_con_el_contenido_completo(cert, archivo):
+    nueva = cert.firmar_archivo_con_guardado(archivo)
+    with open(archivo, "rb") as f:
+        contenido = f.read()
+    with open(f"{archivo}.firma.json", encoding="utf-8") as f:
+        assert json.load(f) == nueva
+    assert nueva["hash"] == hashlib.sha256(contenido).hexdigest()
+    assert cert.validar_firma(contenido, nueva["firma"])
+    # PKCS#1 v1.5 es determinista: la misma firma que la ruta anterior
+    assert nueva["firma"] == cert.firmar(contenido)
+
+
+def test_archivo_alterado_no_verifica(cert, archivo):
+    cert.firmar_archivo_con_guardado(archivo)
+    with open(archivo, "r+b") as f:
+        f.seek(BLOQUE_HASH + 1)
+        byte = f.read(1)[0]
+        f.seek(BLOQUE_HASH + 1)
+        f.write(bytes([byte ^ 0xFF]))
+    resultado = cert.verificar_firma_desde_json(archivo, f"{archivo}.firma.json")
+    assert not resultado["hash_valido"] and not resultado["firma_valida"]
@@ -0,0 +1,28 @@
+from src import IngestaCFDI, SQLiteDBManager, leer_cfdi, recorrer_cfdi
+from conftest import FILES, RFC
+
+
+def _docs(n):
+    rutas = [r.path for _, r in zip(range(n), recorrer_cfdi(FILES, RFC))]
+    return [leer_cfdi(p) for p in rutas]
+
+
+def test_ingesta_invalida_la_cache(tmp_path):
+    with SQLiteDBManager(str(tmp_path / "cfdi.sqlite"), cache=True) as db:
+        ingesta = IngestaCFDI(db)
+        assert db.get_records(ingesta.Comprobante, columns=["uuid"]) == []
+
+        docs = _docs(3)
+        ingesta.cargar(docs)
+        assert len(db.get_records(ingesta.Comprobante, columns=["uuid"])) == 3
+
+
+def test_recargar_reemplaza_en_lugar_de_duplicar(tmp_path):
+    with SQLiteDBManager(str(tmp_path / "cfdi.sqlite")) as db:
+        ingesta = IngestaCFDI(db)
+        docs = _docs(5)
+        ingesta.cargar(docs)
+        resumen = ingesta.cargar(docs)
+        assert resumen["comprobantes"] == 5
+        assert len(db.get_records(ingesta.Comprobante, columns=["uuid"])) == 5
+        assert len(db.get_records(ingesta.Concepto, columns=["uuid"])) == resumen["conceptos"]
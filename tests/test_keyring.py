@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from modelos import CertificadoSAT
+from src import LlaveroSAT, SQLiteDBManager
+from conftest import FILES, RFC
+
+
+def _certificados(path, **registro):
+    with SQLiteDBManager(path) as db:
+        db.create_table(CertificadoSAT)
+        if registro:
+            db.add_record(CertificadoSAT(rfc_empresa=RFC, **registro))
+
+
+def test_db_sin_conectar_se_conecta_al_consultar(tmp_path):
+    path = str(tmp_path / "certificados.sqlite")
+    _certificados(path)
+    with LlaveroSAT(base=FILES, db=SQLiteDBManager(path)) as llavero:
+        cert = llavero.cert(RFC)
+        assert llavero.cert(RFC.lower()) is cert
+        assert len(llavero) == 1
+
+
+def test_vigencia_registrada_vencida_se_rechaza(tmp_path):
+    path = str(tmp_path / "certificados.sqlite")
+    _certificados(path, valido_hasta=datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=1))
+    with LlaveroSAT(base=FILES, db=SQLiteDBManager(path)) as llavero:
+        with pytest.raises(ValueError):
+            llavero.cert(RFC)
+        assert len(llavero) == 0
+
+
+def test_lru_desaloja_sin_cerrar(tmp_path):
+    with LlaveroSAT(base=FILES, max_llaves=1) as llavero:
+        cert = llavero.cert(RFC)
+        llavero._llaves.clear()  # Como si otro RFC la hubiera desalojado
+        assert cert.firmar(b"x")  # Quien la tenía puede seguir firmando
+        assert llavero.cert(RFC) is not cert
@@ -0,0 +1,94 @@
+import asyncio
+import logging
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+from src import AsyncBaseDBManager, SQLiteDBManager
+from routes import dbm
+from routes.dbm import _insertar_lote
+from conftest import Item
+
+
+@pytest.fixture
+def logs_db(caplog):
+    caplog.set_level(logging.INFO, logger="db")
+    return caplog
+
+
+def test_errores_no_exponen_parametros(sqlite_file, logs_db):
+    path = sqlite_file("lote.sqlite", "a")
+    with SQLiteDBManager(path) as db:
+        with pytest.raises(IntegrityError) as error:
+            db.add_records(Item, [{"id": 1, "name": "secreto"}])
+    assert "secreto" not in str(error.value)
+    assert "secreto" not in logs_db.text
+
+
+def test_reintento_fila_por_fila_sin_log_por_fila(sqlite_file, logs_db):
+    path = sqlite_file("lote.sqlite", "a")
+    filas = [(n, {"id": i, "name": f"secreto{i}"}) for n, i in enumerate([1, 2, 3, 1, 4], start=1)]
+    resumen = {"recibidos": len(filas), "insertados": 0, "fallidos": 0, "errores": []}
+
+    async def insertar():
+        async with AsyncBaseDBManager(lambda: SQLiteDBManager(path)) as db:
+            await _insertar_lote(db, Item, filas, resumen)
+
+    asyncio.run(insertar())
+    assert resumen["insertados"] == 3
+    assert [e["fila"] for e in resumen["errores"]] == [1, 4]
+    assert not [r for r in logs_db.records if r.levelno >= logging.ERROR]
+    assert "secreto" not in logs_db.text
+
+
+class _Cuerpo:
+    """Request mínimo: entrega el cuerpo en bloques de `tamano` bytes."""
+
+    def __init__(self, cuerpo, tamano=7):
+        self.cuerpo, self.tamano = cuerpo.encode("utf-8"), tamano
+
+    async def stream(self):
+        for i in range(0, len(self.cuerpo), self.tamano):
+            yield self.cuerpo[i:i + self.tamano]
+
+
+def _arreglo(cuerpo, tamano=7):
+    async def leer():
+        return [f async for f in dbm._filas_arreglo(_Cuerpo(cuerpo, tamano))]
+    return asyncio.run(leer())
+
+
+@pytest.mark.parametrize("tamano", [1, 5, 1000])
+def test_arreglo_valido_en_cualquier_corte(tamano):
+    cuerpo = '[{"id": 1, "name": "a,]}"}, 12345, {"id": 2, "name": "\\"["} ,[1, [2]]]'
+    assert _arreglo(cuerpo, tamano) == [
+        ({"id": 1, "name": "a,]}"}, None), (12345, None), ({"id": 2, "name": '"['}, None), ([1, [2]], None)
+    ]
+
+
+def test_elemento_invalido_no_descarta_los_siguientes():
+    filas = _arreglo('[{"id": 1}, {"id": 2,, "x": 1}, {"id": 3}]')
+    assert [f for f, _ in filas] == [{"id": 1}, None, {"id": 3}]
+    assert filas[1][1].startswith("JSON inválido")
+
+
+def test_falta_coma_entre_elementos():
+    filas = _arreglo('[{"id": 1} {"id": 2}, {"id": 3}]')
+    assert filas == [({"id": 1}, None), (None, "Falta ',' entre elementos del arreglo."), ({"id": 3}, None)]
+
+
+def test_arreglo_sin_cierre():
+    incompleto = (None, "Arreglo JSON incompleto: el cuerpo terminó antes de ']'.")
+    assert _arreglo('[{"id": 1}, {"id": 2') == [({"id": 1}, None), incompleto]
+    assert _arreglo('[{"id": 1}, 2') == [({"id": 1}, None), (2, None), incompleto]
+
+
+def test_elemento_sin_fin_no_acumula_el_cuerpo(monkeypatch):
+    monkeypatch.setattr(dbm, "MAX_ELEMENTO", 100)
+    parser = dbm._ArregloJSON()
+    filas = parser.alimentar('[{"id": 1}, {"id": [')
+    for _ in range(50):
+        filas += parser.alimentar('{"x": "' + "y" * 40 + '"}, ')
+        assert len(parser.buffer) <= 100
+    filas += parser.cerrar()
+    assert filas[0] == ({"id": 1}, None)
+    assert len(filas) == 2 and "se descartó el resto" in filas[1][1]
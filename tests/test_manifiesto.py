@@ -0,0 +1,66 @@
+import os
+import shutil
+
+import pytest
+from src import CertSAT
+from conftest import FILES, RFC
+
+
+@pytest.fixture
+def cert():
+    base = os.path.join(FILES, RFC)
+    with CertSAT(os.path.join(base, f"{RFC}.cer"), os.path.join(base, f"{RFC}.key"),
+                 os.path.join(base, "key.txt")) as cert:
+        yield cert
+
+
+@pytest.fixture
+def periodo(tmp_path):
+    carpeta = tmp_path / "1"
+    shutil.copytree(os.path.join(FILES, RFC, "RECIBIDOS", "2020", "1"), carpeta)
+    return str(carpeta)
+
+
+def _un_archivo(carpeta):
+    for raiz, _, nombres in os.walk(carpeta):
+        for nombre in nombres:
+            if nombre.endswith(".xml"):
+                return os.path.join(raiz, nombre)
+
+
+def test_manifiesto_integro(cert, periodo):
+    manifiesto = cert.firmar_manifiesto(periodo, merkle=True, max_workers=2)
+    assert manifiesto["total"] == 242
+    resultado = cert.verificar_manifiesto(periodo)
+    assert resultado["firma_valida"] and resultado["merkle_valido"]
+    assert resultado["detalle"] == "Verificación completa exitosa."
+
+
+def test_manifiesto_detecta_alterados_faltantes_y_nuevos(cert, periodo):
+    cert.firmar_manifiesto(periodo)
+    alterado = _un_archivo(periodo)
+    with open(alterado, "ab") as f:
+        f.write(b" ")
+    borrado = os.path.relpath(_un_archivo(os.path.join(periodo, "E")), periodo).replace(os.sep, "/")
+    os.remove(os.path.join(periodo, borrado))
+    with open(os.path.join(periodo, "nuevo.xml"), "w") as f:
+        f.write("<nuevo/>")
+
+    resultado = cert.verificar_manifiesto(periodo)
+    assert resultado["firma_valida"]
+    assert resultado["alterados"] == [os.path.relpath(alterado, periodo).replace(os.sep, "/")]
+    assert resultado["faltantes"] == [borrado]
+    assert resultado["nuevos"] == ["nuevo.xml"]
+
+    individual = cert.verificar_manifiesto(periodo, archivo=alterado)
+    assert individual["alterados"] and not individual["faltantes"] and not individual["nuevos"]
+
+
+def test_manifiesto_editado_invalida_la_firma(cert, periodo):
+    destino = os.path.join(periodo, "..", "manifiesto.json")
+    cert.firmar_manifiesto(periodo, destino=destino)
+    with open(destino, encoding="utf-8") as f:
+        contenido = f.read()
+    with open(destino, "w", encoding="utf-8") as f:
+        f.write(contenido.replace('"total": 242', '"total": 241'))
+    assert not cert.verificar_manifiesto(periodo, path_manifiesto=destino)["firma_valida"]
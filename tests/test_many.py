@@ -0,0 +1,50 @@
+import pytest
+from sqlalchemy import delete, event
+from sqlalchemy.dialects import mssql
+from src import SQLiteDBManager
+from src.DB.BaseDBM import MAX_PARAMS
+from conftest import Folio, Item
+
+
+@pytest.fixture
+def folios(tmp_path):
+    llaves = [("A", 2020 + i % 3, i) for i in range(1500)]
+    with SQLiteDBManager(str(tmp_path / "folios.sqlite")) as db:
+        db.create_table(Folio)
+        db.add_records(Folio, [dict(serie=s, anio=a, numero=n, name="x") for s, a, n in llaves])
+        parametros = []
+        event.listen(db.engine, "before_cursor_execute",
+                     lambda conn, cursor, sql, params, context, many: parametros.append(len(params)))
+        yield db, llaves, parametros
+
+
+def test_delete_many_llave_simple(sqlite_file):
+    path = sqlite_file("many.sqlite", "a", "b", "c", "d")
+    with SQLiteDBManager(path) as db:
+        assert db.delete_many(Item, [1, 3, 99]) == 2
+        assert sorted(i.id for i in db.get_records(Item)) == [2, 4]
+
+
+def test_delete_many_llave_compuesta_por_lotes(folios):
+    db, llaves, parametros = folios
+    parametros.clear()
+    assert db.delete_many(Folio, llaves[:1400]) == 1400
+    assert len(db.get_records(Folio)) == 100
+    assert max(parametros) <= MAX_PARAMS
+    assert len(parametros) == 3  # Dos DELETE de 700 llaves (tres columnas) y la lectura
+
+
+def test_update_many_llave_compuesta(folios):
+    db, llaves, parametros = folios
+    parametros.clear()
+    assert db.update_many(Folio, llaves[:800], name="z") == 800
+    assert max(parametros) <= MAX_PARAMS
+    assert sum(f.name == "z" for f in db.get_records(Folio)) == 800
+
+
+def test_llave_compuesta_sin_in_de_tuplas():
+    db = SQLiteDBManager.__new__(SQLiteDBManager)
+    stmt = delete(Folio).where(db._pk_in(Folio, [("A", 2020, 1), ("B", 2021, 2)]))
+    sql = str(stmt.compile(dialect=mssql.dialect()))
+    assert " IN " not in sql
+    assert sql.count(" OR ") == 1
@@ -0,0 +1,39 @@
+from sqlalchemy import select
+from sqlalchemy.dialects import mssql
+from src import BaseDBManager, SQLiteDBManager
+from conftest import Folio, Item
+
+
+def _paginas(db, table_class, limit, llave):
+    after, leidas = None, []
+    while True:
+        pagina = db.get_page(table_class, after=after, limit=limit)
+        if not pagina:
+            return leidas
+        leidas.append(pagina)
+        after = llave(pagina[-1])
+
+
+def test_paginas_por_llave_simple(sqlite_file):
+    path = sqlite_file("paginas.sqlite", *[f"n{i}" for i in range(1, 8)])
+    with SQLiteDBManager(path) as db:
+        paginas = _paginas(db, Item, 3, lambda r: r.id)
+    assert [[r.id for r in p] for p in paginas] == [[1, 2, 3], [4, 5, 6], [7]]
+
+
+def test_paginas_por_llave_compuesta(tmp_path):
+    llaves = [(s, a, n) for s in ("A", "B") for a in (2020, 2021) for n in (1, 2, 10)]
+    with SQLiteDBManager(str(tmp_path / "folios.sqlite")) as db:
+        db.create_table(Folio)
+        db.add_records(Folio, [dict(serie=s, anio=a, numero=n) for s, a, n in reversed(llaves)])
+        paginas = _paginas(db, Folio, 5, lambda r: (r.serie, r.anio, r.numero))
+    assert [(r.serie, r.anio, r.numero) for p in paginas for r in p] == llaves
+    assert [len(p) for p in paginas] == [5, 5, 2]
+
+
+def test_llave_compuesta_sin_comparar_tuplas():
+    pk = list(Folio.__table__.primary_key.columns)
+    stmt = select(Folio).where(BaseDBManager._after_key(pk, ("A", 2020, 2)))
+    sql = str(stmt.compile(dialect=mssql.dialect()))
+    assert "(test_folios.serie, test_folios.anio, test_folios.numero) >" not in sql
+    assert sql.count(" OR ") == 2
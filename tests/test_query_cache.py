@@ -0,0 +1,49 @@
+from src import QueryCache, SQLiteDBManager
+from conftest import Item
+
+
+def _nombres(db):
+    return [r["name"] for r in db.get_records(Item, columns=["name"])]
+
+
+def test_lector_y_escritor_comparten_cache(sqlite_file):
+    path = sqlite_file("cache.sqlite", "a", "b")
+
+    with SQLiteDBManager(path, cache=True) as rw, SQLiteDBManager(path, cache=True, read_only=True) as ro:
+        assert rw.cache is ro.cache
+        assert _nombres(ro) == ["a", "b"]
+        rw.update_many(Item, [1], name="z")
+        assert _nombres(ro) == ["z", "b"]
+
+
+def test_escritura_invalida_solo_su_tabla():
+    cache = QueryCache(max_entries=10, ttl=60)
+    cache.get_or_load(("items", 1), lambda: "uno")
+    cache.get_or_load(("otra", 1), lambda: "otra")
+    cache.invalidate("items")
+    assert cache.get_or_load(("items", 1), lambda: "nuevo") == "nuevo"
+    assert cache.get_or_load(("otra", 1), lambda: "nuevo") == "otra"
+
+
+def test_lectura_que_compite_con_escritura_no_se_guarda():
+    cache = QueryCache(max_entries=10, ttl=60)
+
+    def carga_con_escritura():
+        cache.invalidate("items")  # Una escritura termina mientras se lee
+        return "viejo"
+
+    assert cache.get_or_load(("items", 1), carga_con_escritura) == "viejo"
+    assert cache.get_or_load(("items", 1), lambda: "nuevo") == "nuevo"
+
+
+def test_lru_y_ttl(monkeypatch):
+    import src.DB.QueryCache as modulo
+
+    ahora = [1000.0]
+    monkeypatch.setattr(modulo.time, "monotonic", lambda: ahora[0])
+    cache = QueryCache(max_entries=2, ttl=10)
+    for i in range(3):
+        cache.get_or_load(("items", i), lambda i=i: i)
+    assert cache.get_or_load(("items", 0), lambda: "recargado") == "recargado"
+    ahora[0] += 11
+    assert cache.get_or_load(("items", 2), lambda: "expirado") == "expirado"
@@ -0,0 +1,100 @@
+import urllib.parse
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from src import MSSQLDBManager, SQLiteDBManager
+from conftest import Item
+
+
+def _nombres(db):
+    return [r["name"] for r in db.get_records(Item, columns=["name"])]
+
+
+def test_lecturas_en_round_robin_entre_replicas(sqlite_file):
+    primario = sqlite_file("primario.sqlite", "primario")
+    r1 = sqlite_file("r1.sqlite", "r1")
+    r2 = sqlite_file("r2.sqlite", "r2")
+
+    with SQLiteDBManager(primario, replicas=[r1, r2]) as db:
+        leidos = {_nombres(db)[0] for _ in range(4)}
+        assert leidos == {"r1", "r2"}
+
+
+def test_cada_replica_tiene_su_propio_engine(sqlite_file):
+    primario = sqlite_file("primario.sqlite", "primario")
+    r1 = sqlite_file("r1.sqlite", "r1")
+    r2 = sqlite_file("r2.sqlite", "r2")
+
+    with SQLiteDBManager(primario, replicas=[r1, r2]) as db:
+        engines = [engine for _, engine in db.router.replicas] + [db.engine]
+        assert len({id(e) for e in engines}) == 3
+        assert len({key for key, _ in db.router.replicas}) == 2
+
+
+def test_replica_caida_se_expulsa_y_lee_la_siguiente(sqlite_file, tmp_path):
+    primario = sqlite_file("primario.sqlite", "primario")
+    r1 = sqlite_file("r1.sqlite", "r1")
+    caida = str(tmp_path / "no_existe.sqlite")  # mode=ro: falla al conectar
+
+    with SQLiteDBManager(primario, replicas=[caida, r1], replica_eject_seconds=60) as db:
+        assert [_nombres(db)[0] for _ in range(3)] == ["r1", "r1", "r1"]
+        assert len(db.router.candidates()) == 1
+
+
+def test_sin_replicas_sanas_lee_del_primario(sqlite_file, tmp_path):
+    primario = sqlite_file("primario.sqlite", "primario")
+    caida = str(tmp_path / "no_existe.sqlite")
+
+    with SQLiteDBManager(primario, replicas=[caida]) as db:
+        assert _nombres(db) == ["primario"]
+
+
+def test_read_your_writes_y_primary(sqlite_file):
+    primario = sqlite_file("primario.sqlite", "primario")
+    r1 = sqlite_file("r1.sqlite", "r1")
+
+    with SQLiteDBManager(primario, replicas=[r1], read_your_writes=60) as db:
+        assert _nombres(db) == ["r1"]
+        with db.primary():
+            assert _nombres(db) == ["primario"]
+        db.add_records(Item, [{"id": 2, "name": "nuevo"}])
+        assert _nombres(db) == ["primario", "nuevo"]
+
+
+def _mssql(server, database):
+    db = MSSQLDBManager.__new__(MSSQLDBManager)
+    db.server, db.port, db.user, db.password, db.database = server, 1433, "sa", "x", database
+    db.database_uri = db._build_uri()
+    return db
+
+
+def test_llave_de_replica_mssql_por_servidor_y_base():
+    db = _mssql("primario", "cfdi")
+    r1 = _mssql("replica1", "cfdi").database_uri
+    r2 = _mssql("replica2", "cfdi").database_uri
+
+    keys = {db._url_key(r1), db._url_key(r2), db._pool_key()}
+    assert len(keys) == 3
+    assert db._url_key(r1) == ("mssql", "replica1,1433", "cfdi", "sa")
+
+
+def test_llave_de_replica_incluye_puerto():
+    db = SQLiteDBManager.__new__(SQLiteDBManager)
+    assert db._url_key("postgresql://u@h:5432/d") != db._url_key("postgresql://u@h:5433/d")
+    odbc = "mssql+pyodbc:///?odbc_connect=" + urllib.parse.quote_plus("SERVER=h,1434;DATABASE=d;UID=u;")
+    assert _mssql("h", "d")._url_key(odbc) == ("mssql", "h,1434", "d", "u")
+    assert _mssql("h", "d")._url_endpoint(odbc) == ("h", 1434)
+
+
+def test_error_de_consulta_en_replica_no_la_expulsa(sqlite_file, tmp_path):
+    primario = sqlite_file("primario.sqlite", "primario")
+    sin_tabla = str(tmp_path / "sin_tabla.sqlite")
+    with SQLiteDBManager(sin_tabla) as db:
+        db.optimize()  # Crea el archivo sin la tabla de prueba
+
+    with SQLiteDBManager(primario, replicas=[sin_tabla]) as db:
+        for leer in (lambda: _nombres(db), lambda: list(db.stream_records(Item, columns=["name"]))):
+            with pytest.raises(OperationalError, match="no such table"):
+                leer()
+        assert len(db.router.candidates()) == 1
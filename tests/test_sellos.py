@@ -0,0 +1,31 @@
+import shutil
+
+from src import VerificadorSellos, verificar_sello, recorrer_cfdi
+from conftest import FILES, RFC
+
+
+def test_sellos_del_periodo_son_validos(tmp_path):
+    destino = tmp_path / "reporte.json"
+    reporte = VerificadorSellos(workers=2, lote=50).verificar(FILES, RFC, 2020, 1, destino=str(destino))
+    assert reporte["total"] == 242
+    assert reporte["validos"] == 242 and not reporte["invalidos"]
+    assert destino.exists()
+
+
+def test_cfdi_alterado_no_pasa(tmp_path):
+    ruta = next(recorrer_cfdi(FILES, RFC))
+    copia = tmp_path / "alterado.xml"
+    shutil.copy(ruta.path, copia)
+    texto = copia.read_text(encoding="utf-8")
+    copia.write_text(texto.replace('Total="', 'Total="1', 1), encoding="utf-8")
+
+    resultado = verificar_sello(str(copia))
+    assert resultado["uuid"] == ruta.uuid
+    assert not resultado["valido"]
+    assert resultado["motivo"] == "El Sello no corresponde a la cadena original."
+
+
+def test_archivo_sin_comprobante(tmp_path):
+    path = tmp_path / "otro.xml"
+    path.write_text("<otro/>", encoding="utf-8")
+    assert verificar_sello(str(path))["motivo"] == "El archivo no contiene un cfdi:Comprobante 3.3 o 4.0."
@@ -0,0 +1,39 @@
+import pytest
+from src import DBStats, MSSQLDBManager, SQLiteDBManager
+from conftest import Item
+
+
+def _label(path):
+    return f"sqlite:///{path}"
+
+
+def test_filas_regresadas_por_select(sqlite_file):
+    path = sqlite_file("stats.sqlite", "a", "b", "c")
+    DBStats.reset()
+    with SQLiteDBManager(path) as db:
+        db.get_records(Item)
+        assert len(list(db.stream_records(Item, columns=["name"]))) == 3
+        db.get_record(Item, 1)
+        db.update_many(Item, [1, 2], name="z")
+
+    stats = DBStats.snapshot()[_label(path)]
+    assert stats["rows_returned"] == 7
+    assert stats["rows_affected"] == 2
+
+
+def test_destinos_mssql_no_comparten_etiqueta():
+    pytest.importorskip("pyodbc")
+    engines = []
+    for server, database in (("srv1", "cfdi"), ("srv2", "nomina")):
+        db = MSSQLDBManager.__new__(MSSQLDBManager)
+        db.server, db.port, db.user, db.password, db.database = server, 1433, "sa", "x", database
+        db.database_uri = db._build_uri()
+        db.stats, db.slow_query_ms, db.breaker, db.hide_parameters = True, 500, None, True
+        engines.append(db._create_engine(db.database_uri))
+
+    etiquetas = DBStats.snapshot()
+    assert "mssql://srv1,1433/cfdi" in etiquetas
+    assert "mssql://srv2,1433/nomina" in etiquetas
+    assert "mssql+pyodbc:///" not in etiquetas
+    for engine in engines:
+        engine.dispose()